@@ -0,0 +1,166 @@
+"""
+Category Matcher Benchmark
+✅ بيقارن classify_by_keywords القديم (`kw in title` لكل keyword) بالـ KeywordMatcher (trie + word boundaries)
+✅ corpus ثابت (seed) من آلاف العناوين: عناوين فيها keywords (جمع / أرقام / case مختلف)
+   + عناوين فخ للـ substring ("email" / "sapphire" / "hair ") + عناوين من غير keywords
+✅ بيطلع µs/title و titles/s و نسبة الاتفاق + أمثلة للعناوين اللي النتيجة فيها اختلفت
+✅ REGRESSIONS: عناوين ليها كاتيجوري متوقعة (hits غلط اتصلحت قبل كده) - أي اختلاف → exit code 1
+
+الاستخدام:
+    python -m benchmarks.category_matcher
+    python -m benchmarks.category_matcher --titles 20000 --repeat 5
+    python -m benchmarks.category_matcher --file titles.txt    # عنوان في كل سطر (مثلاً export من courses)
+"""
+
+import argparse
+import json
+import random
+import time
+from collections import Counter
+
+from src.services.categories import CATEGORY_KEYWORDS, classify_by_keywords, classify_many
+
+TEMPLATES = (
+    "The Complete {kw} Course {year}",
+    "{kw} for Beginners: From Zero to Hero",
+    "Master {kw} - Hands-On Projects",
+    "Learn {kw} and {kw2} in 30 Days",
+    "{kw}: The Ultimate Guide [{year}]",
+    "Practical {kw}s Bootcamp",
+    "{kw} Masterclass + {kw2}",
+    "Advanced {kw} Techniques for Professionals",
+)
+
+# كلمات عادية فيها keyword كـ substring - الـ naive بيصنفها غلط
+TRAPS = (
+    "Email Etiquette for Busy People", "Sapphire and Gemstone Identification", "Hair Braiding Basics",
+    "Social Skills for Introverts", "Clean Eating Made Simple", "Semester Planning for Students",
+    "Rapid Reading Techniques", "Restaurant Management Basics", "Chair Yoga for Seniors",
+    "Watercolor Painting Essentials", "Sword Fighting Fundamentals", "Guitar Chords and Scales",
+    "Spanish Guitar for Beginners", "Trail Running Fundamentals", "Bread Baking at Home",
+)
+
+# عنوان → الكاتيجوري المتوقعة (None = مش واضح من الـ keywords)
+REGRESSIONS = {
+    # التصريف ("ing" / "er") كان بيطابق keywords تانية
+    "Resting heart rate basics":  None,
+    "Reacting to Stress at Work": "Health & Fitness",
+    "Leaning into Change":        None,
+    # الـ substring القديم
+    "Email Etiquette for Busy People":       None,
+    "Sapphire and Gemstone Identification":  None,
+    # لازم يفضلوا يتطابقوا
+    "React Hooks Masterclass":        "Programming",
+    "REST APIs with Flask":           "Programming",
+    "Data Structures and Algorithms": "Programming",
+    "Graphic Designer Bootcamp":      "Design & Creative",
+}
+
+PLAIN = (
+    "Origami Step by Step", "Beekeeping for Beginners", "Calligraphy Fundamentals", "Knitting Basics",
+    "Wine Tasting Essentials", "Chess Openings Explained", "Astronomy for Everyone", "Gardening at Home",
+)
+
+
+def naive_classify(title: str) -> str | None:
+    """نفس classify_by_keywords قبل الـ KeywordMatcher (للمقارنة)"""
+    title_lower = title.lower()
+    scores = {}
+    for category, keywords in CATEGORY_KEYWORDS.items():
+        score = sum(1 for kw in keywords if kw in title_lower)
+        if score > 0:
+            scores[category] = score
+    if not scores:
+        return None
+    return max(scores, key=scores.get)
+
+
+def build_corpus(size: int, seed: int = 1337) -> list:
+    rng = random.Random(seed)
+    keywords = [kw.strip(" ,") for kws in CATEGORY_KEYWORDS.values() for kw in kws]
+    titles = []
+    for _ in range(size):
+        roll = rng.random()
+        if roll < 0.75:
+            kw, kw2 = rng.choice(keywords), rng.choice(keywords)
+            style = rng.choice((str.title, str.upper, str.lower, lambda s: s))
+            titles.append(rng.choice(TEMPLATES).format(kw=style(kw), kw2=kw2, year=rng.choice((2023, 2024, 2025))))
+        elif roll < 0.9:
+            titles.append(rng.choice(TRAPS))
+        else:
+            titles.append(rng.choice(PLAIN))
+    return titles
+
+
+def check_regressions() -> list:
+    """[(title, expected, got)] للعناوين اللي النتيجة فيها مش المتوقعة"""
+    return [(t, want, got) for t, want in REGRESSIONS.items() if (got := classify_by_keywords(t)) != want]
+
+
+def _time(fn, titles: list, repeat: int) -> float:
+    """أحسن زمن (ثواني) من repeat مرات"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(titles)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RILLZO category matcher benchmark")
+    parser.add_argument("--titles", type=int, default=10_000, help="حجم الـ corpus الصناعي")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--file", help="عناوين حقيقية - عنوان في كل سطر")
+    parser.add_argument("--examples", type=int, default=10, help="عدد أمثلة الاختلاف اللي تتطبع")
+    args = parser.parse_args()
+
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            titles = [line.strip() for line in f if line.strip()]
+    else:
+        titles = build_corpus(args.titles)
+
+    implementations = {
+        "naive":         lambda ts: [naive_classify(t) for t in ts],
+        "matcher":       lambda ts: [classify_by_keywords(t) for t in ts],
+        "classify_many": classify_many,
+    }
+    results = {}
+    for name, fn in implementations.items():
+        seconds = _time(fn, titles, args.repeat)
+        results[name] = {
+            "us_per_title": round(seconds / len(titles) * 1e6, 2),
+            "titles_per_s": round(len(titles) / seconds),
+        }
+    base = results["naive"]["us_per_title"]
+    for name in results:
+        results[name]["speedup"] = round(base / results[name]["us_per_title"], 2)
+
+    old = [naive_classify(t) for t in titles]
+    new = classify_many(titles)
+    changed = [(t, a, b) for t, a, b in zip(titles, old, new) if a != b]
+    summary = {
+        "titles":    len(titles),
+        "unique":    len(set(titles)),
+        "results":   results,
+        "agreement": round(1 - len(changed) / len(titles), 4),
+        "changes":   {f"{a} → {b}": n for (a, b), n in Counter((a, b) for _, a, b in changed).most_common(10)},
+    }
+    print(json.dumps(summary, indent=2, ensure_ascii=False))
+    if changed:
+        print("\n🔍 أمثلة للاختلاف (naive → matcher):")
+        for title, a, b in list(dict.fromkeys(changed))[:args.examples]:
+            print(f"   {title!r}: {a} → {b}")
+
+    failed = check_regressions()
+    if failed:
+        print("\n❌ regressions:")
+        for title, want, got in failed:
+            print(f"   {title!r}: متوقع {want} → {got}")
+        raise SystemExit(1)
+    print(f"\n✅ regressions: {len(REGRESSIONS)} عنوان")
+
+
+if __name__ == "__main__":
+    main()
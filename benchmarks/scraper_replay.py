@@ -0,0 +1,357 @@
+"""
+Scraper Replay Benchmark
+✅ record: بيشغل السكرابر على المواقع الحقيقية وبيحفظ كل الـ responses (listing + detail) على الديسك
+✅ replay: بيشغل نفس الـ pipeline offline - الـ browser الحقيقي بياخد الصفحات من HTTP server محلي
+✅ bench: بيكرر الـ replay ويطلع pages/s و courses/s و latency percentiles والذاكرة
+
+الاستخدام:
+    python -m benchmarks.scraper_replay record --dir benchmarks/fixtures
+    python -m benchmarks.scraper_replay replay --dir benchmarks/fixtures
+    python -m benchmarks.scraper_replay bench  --dir benchmarks/fixtures --runs 5
+
+Mongo: BENCH_MONGO_URI لو متحدد - غير كده mongomock-motor لو متسطب (in-memory) - غير كده localhost
+الـ DB بتتجرب قبل أول تشغيلة (bulk_write) - وأي تشغيلة ما حفظتش ولا كورس بتوقف الـ bench
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+
+import httpx
+from pymongo import UpdateOne
+
+from src.services import http_resolver, interception, near_dup, real_discount_api, telemetry, udemy_link, wp_feed
+from src.services.browser_manager import browser_manager
+from src.services.utils import percentile
+from src.services.indexes import ensure_indexes
+from src.services.scraper import _run_all_sites
+
+BENCH_MONGO_URI = os.getenv("BENCH_MONGO_URI")
+BENCH_DB_NAME   = os.getenv("BENCH_DB_NAME", "rillzo_bench")
+
+# الـ headers اللي بنحفظها مع كل response
+KEPT_HEADERS = ("content-type", "location")
+
+
+# ══════════════════════════════════════════════
+# 💾 Fixtures على الديسك
+# ══════════════════════════════════════════════
+class FixtureStore:
+    def __init__(self, root: str):
+        self.root  = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._index_path = self.root / "index.json"
+        self.index = json.loads(self._index_path.read_text()) if self._index_path.exists() else {}
+
+    @staticmethod
+    def key(method: str, url: str) -> str:
+        return hashlib.sha1(f"{method.upper()} {url}".encode()).hexdigest()
+
+    def save(self, method: str, url: str, status: int, headers: dict, body: bytes):
+        key = self.key(method, url)
+        (self.root / f"{key}.body").write_bytes(body)
+        self.index[key] = {
+            "url":     url,
+            "status":  status,
+            "headers": {k: v for k, v in headers.items() if k.lower() in KEPT_HEADERS},
+        }
+
+    def get(self, method: str, url: str):
+        key = self.key(method, url)
+        return key, self.index.get(key)
+
+    def body(self, key: str) -> bytes:
+        return (self.root / f"{key}.body").read_bytes()
+
+    def flush(self):
+        self._index_path.write_text(json.dumps(self.index, indent=1))
+
+
+# ══════════════════════════════════════════════
+# 🌐 HTTP server محلي بيقدم الـ fixtures
+# ══════════════════════════════════════════════
+class ReplayServer:
+    def __init__(self, store: FixtureStore):
+        store_ref = store
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                key  = self.path.strip("/")
+                meta = store_ref.index.get(key)
+                if not meta:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                body = store_ref.body(key)
+                self.send_response(meta["status"])
+                for name, value in meta["headers"].items():
+                    self.send_header(name, value)
+                self.send_header("content-length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base    = f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self._server.shutdown()
+
+
+# ══════════════════════════════════════════════
+# 🎭 Browser routes (record / replay)
+# ══════════════════════════════════════════════
+def recording_route(store: FixtureStore):
+    async def _handle(route, request):
+        try:
+            response = await route.fetch()
+            body = await response.body()
+        except Exception:
+            await route.abort()
+            return
+        store.save(request.method, request.url, response.status, response.headers, body)
+        await route.fulfill(response=response, body=body)
+    return _handle
+
+
+def replay_route(store: FixtureStore, server: ReplayServer, client: httpx.AsyncClient):
+    async def _handle(route, request):
+        key, meta = store.get(request.method, request.url)
+        if not meta:
+            await route.abort()
+            return
+        response = await client.get(f"{server.base}/{key}")
+        await route.fulfill(status=response.status_code, headers=dict(response.headers), body=response.content)
+    return _handle
+
+
+# ══════════════════════════════════════════════
+# 📡 httpx transports (HTTP resolver)
+# ══════════════════════════════════════════════
+class RecordingTransport(httpx.AsyncBaseTransport):
+    def __init__(self, store: FixtureStore):
+        self.store = store
+        self.inner = httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request):
+        response = await self.inner.handle_async_request(request)
+        body = await response.aread()
+        self.store.save(request.method, str(request.url), response.status_code, dict(response.headers), body)
+        # الـ body اتفك ضغطه خلاص - نشيل الـ headers اللي بتوصفه مضغوط
+        headers = [(k, v) for k, v in response.headers.items()
+                   if k.lower() not in ("content-encoding", "content-length", "transfer-encoding")]
+        return httpx.Response(response.status_code, headers=headers, content=body, request=request)
+
+    async def aclose(self):
+        await self.inner.aclose()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    def __init__(self, store: FixtureStore, server: ReplayServer):
+        self.store  = store
+        self.server = server
+        self.inner  = httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request):
+        key, meta = self.store.get(request.method, str(request.url))
+        if not meta:
+            return httpx.Response(404, request=request)
+        local = httpx.Request("GET", f"{self.server.base}/{key}")
+        response = await self.inner.handle_async_request(local)
+        body = await response.aread()
+        return httpx.Response(response.status_code, headers=response.headers, content=body, request=request)
+
+    async def aclose(self):
+        await self.inner.aclose()
+
+
+# ══════════════════════════════════════════════
+# 🗄️ Mongo stand-in
+# ══════════════════════════════════════════════
+def open_db():
+    if not BENCH_MONGO_URI:
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+            return AsyncMongoMockClient()[BENCH_DB_NAME], "mongomock"
+        except ImportError:
+            pass
+    from motor.motor_asyncio import AsyncIOMotorClient
+    uri = BENCH_MONGO_URI or "mongodb://localhost:27017"
+    return AsyncIOMotorClient(uri)[BENCH_DB_NAME], uri
+
+
+async def check_db(db, label: str):
+    """
+    الـ CourseWriter بيبلع أخطاء الـ bulk_write - لو الـ DB مش بتدعمه الـ bench هيطلع 0 كورس من غير ما حد ياخد باله
+    (mongomock القديم مع pymongo 4.19+: add_update() مش بياخد sort)
+    """
+    probe = db["_bench_probe"]
+    try:
+        await probe.bulk_write([UpdateOne({"_id": "probe"}, {"$set": {"ok": True}}, upsert=True)], ordered=False)
+    except Exception as e:
+        raise SystemExit(f"❌ الـ Mongo ({label}) مش بيدعم bulk_write: {e}\n   حدّث mongomock أو استخدم BENCH_MONGO_URI")
+    finally:
+        await probe.drop()
+
+
+async def reset_db(db):
+    """كل تشغيلة بتبدأ من DB فاضية - عشان نفس الكورسات تبان جديدة"""
+    for name in await db.list_collection_names():
+        await db[name].drop()
+    await ensure_indexes(db)
+
+
+def reset_process_state():
+    """
+    الحالة اللي في ذاكرة الـ process من التشغيلة اللي فاتت - لازم تتمسح مع الـ DB
+    غير كده التشغيلة التانية بتبدأ بالـ endpoint / الـ feed backend / الكاش جاهزين والأرقام مش متقارنة
+    """
+    real_discount_api.forget()
+    wp_feed._backend.clear()
+    wp_feed._down_until.clear()
+    udemy_link._CACHE.clear()
+    udemy_link._backfilled = False
+    near_dup.index = near_dup.NearDupIndex()
+    near_dup._backfilled = False
+
+
+def _percentile(values: list, pct: float) -> float:
+    return percentile(values, pct) or 0.0
+
+
+def _python_rss_mb() -> float | None:
+    try:
+        import psutil
+        return round(psutil.Process().memory_info().rss / 1024 / 1024, 1)
+    except ImportError:
+        return None
+
+
+async def run_once(db) -> dict:
+    """تشغيلة كاملة لـ _run_all_sites وبترجع ملخص الأرقام"""
+    await reset_db(db)
+    reset_process_state()
+    async with browser_manager.session() as browser:
+        run = telemetry.RunRecorder("bench", engine=browser_manager.engine)
+        started = time.monotonic()
+        await _run_all_sites(db, browser, run)
+        wall = time.monotonic() - started
+
+    sites, latencies = {}, []
+    for site_key, rec in run.sites.items():
+        doc   = rec.to_doc()
+        pages = len(doc["pages"]) + doc["counts"]["resolved"] + doc["counts"]["failed"]
+        secs  = doc["durationMs"] / 1000 or 1e-9
+        latencies += [p["navMs"] + p["extractMs"] for p in doc["pages"]]
+        sites[site_key] = {
+            "seconds":     round(secs, 2),
+            "pages":       pages,
+            "courses":     doc["counts"]["saved"],
+            "pages_per_s": round(pages / secs, 2),
+            "courses_per_s": round(doc["counts"]["saved"] / secs, 2),
+        }
+    if not sum(s["courses"] for s in sites.values()):
+        # DB فاضية في أول كل تشغيلة - كل كورس لازم يبان جديد
+        raise SystemExit("❌ التشغيلة ما حفظتش ولا كورس - الأرقام مالهاش معنى (شوف الـ log)")
+    return {
+        "wall_seconds":   round(wall, 2),
+        "sites":          sites,
+        "page_latency_ms": latencies,
+        "browser_rss_mb": browser_manager.rss_mb(),
+        "python_rss_mb":  _python_rss_mb(),
+    }
+
+
+def summarize(results: list) -> dict:
+    latencies = [ms for r in results for ms in r["page_latency_ms"]]
+    sites = {}
+    for r in results:
+        for site_key, s in r["sites"].items():
+            agg = sites.setdefault(site_key, {"pages_per_s": [], "courses_per_s": [], "seconds": []})
+            for field in agg:
+                agg[field].append(s[field])
+    return {
+        "runs":            len(results),
+        "wall_seconds_p50": _percentile([r["wall_seconds"] for r in results], 50),
+        "page_latency_ms": {
+            "p50": _percentile(latencies, 50),
+            "p95": _percentile(latencies, 95),
+            "p99": _percentile(latencies, 99),
+        },
+        "sites": {
+            site_key: {field: _percentile(values, 50) for field, values in agg.items()}
+            for site_key, agg in sites.items()
+        },
+        "browser_rss_mb_max": max((r["browser_rss_mb"] or 0) for r in results),
+        "python_rss_mb_max":  max((r["python_rss_mb"] or 0) for r in results),
+    }
+
+
+# ══════════════════════════════════════════════
+# ▶️ CLI
+# ══════════════════════════════════════════════
+async def main():
+    parser = argparse.ArgumentParser(description="RILLZO scraper record / replay benchmark")
+    parser.add_argument("mode", choices=["record", "replay", "bench"])
+    parser.add_argument("--dir",  default="benchmarks/fixtures")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", help="اكتب النتيجة في ملف JSON")
+    args = parser.parse_args()
+
+    store = FixtureStore(args.dir)
+    db, db_label = open_db()
+    print(f"🗄️ Mongo: {db_label}")
+    await check_db(db, db_label)
+
+    if args.mode == "record":
+        interception.set_override(recording_route(store))
+        await http_resolver.set_transport(RecordingTransport(store))
+        try:
+            result = await run_once(db)
+        finally:
+            store.flush()
+            await browser_manager.close()
+            await http_resolver.close_client()
+        print(f"💾 اتسجل {len(store.index)} response في {args.dir}")
+        print(json.dumps({k: v for k, v in result.items() if k != "page_latency_ms"}, indent=2))
+        return
+
+    if not store.index:
+        raise SystemExit(f"❌ مفيش fixtures في {args.dir} - شغّل record الأول")
+
+    server = ReplayServer(store)
+    server.start()
+    async with httpx.AsyncClient() as client:
+        interception.set_override(replay_route(store, server, client))
+        await http_resolver.set_transport(ReplayTransport(store, server))
+        try:
+            runs = 1 if args.mode == "replay" else args.runs
+            results = []
+            for i in range(runs):
+                result = await run_once(db)
+                results.append(result)
+                print(f"🏁 run {i + 1}/{runs}: {result['wall_seconds']}s")
+        finally:
+            await browser_manager.close()
+            await http_resolver.close_client()
+            server.stop()
+
+    summary = summarize(results)
+    print(json.dumps(summary, indent=2))
+    if args.json:
+        Path(args.json).write_text(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -6,7 +6,6 @@
 ╚══════════════════════════════════════════════════════════════════════╝
 """
 
-import asyncio
 import os
 import logging
 from contextlib import asynccontextmanager
@@ -15,14 +14,15 @@ from dotenv import load_dotenv
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from motor.motor_asyncio import AsyncIOMotorClient
 
 from src.routes.auth import router as auth_router
 from src.routes.courses import router as courses_router
-from src.services.scraper import scrape_coupon_scorpion
-from src.services.expire import expire_old_courses
-from src.services.categories import update_existing_categories
+from src.routes.admin import router as admin_router
+from src.services.http_resolver import close_client as close_http_client
+from src.services.browser_manager import browser_manager
+from src.services.indexes import ensure_indexes
+from src.services.jobs import Worker
 
 # ─────────────────────────────────────────────
 # 🔧 إعداد البيئة
@@ -39,6 +39,9 @@ log = logging.getLogger("RILLZO")
 MONGO_URI = os.getenv("MONGO_URI") or os.getenv("MONGODB_URI", "mongodb://localhost:27017")
 DB_NAME   = os.getenv("DB_NAME", "rillzo")
 PORT      = int(os.getenv("PORT", 7860))  # 7860 إلزامي لـ Hugging Face
+# السكرابر بيشتغل في worker.py - true = يشتغل جوه الـ API process (تطوير / deploy بـ process واحد)
+# آمن مع أكتر من uvicorn worker: الـ scheduler للـ leader بس (src/services/leader.py)
+EMBEDDED_WORKER = os.getenv("EMBEDDED_WORKER", "false") == "true"
 
 # ─────────────────────────────────────────────
 # 🗄️ MongoDB Client (Global)
@@ -48,12 +51,6 @@ mongo_client: AsyncIOMotorClient = None
 def get_db():
     return mongo_client[DB_NAME]
 
-# ─────────────────────────────────────────────
-# 📅 Scheduler (بدل node-cron)
-# APScheduler أقوى وأدق من node-cron
-# ─────────────────────────────────────────────
-scheduler = AsyncIOScheduler()
-
 # ─────────────────────────────────────────────
 # 🚀 Lifespan (بدل mongoose.connect().then())
 # ─────────────────────────────────────────────
@@ -68,43 +65,26 @@ async def lifespan(app: FastAPI):
 
     # إنشاء الـ Indexes تلقائياً
     db = app.state.db
-    await db["users"].create_index("email", unique=True)
-    await db["courses"].create_index("slug", unique=True)
-    await db["courses"].create_index("udemyLink", unique=True)
+    await ensure_indexes(db)
     log.info("✅ متصل بـ MongoDB بنجاح")
 
-    # أول عملية اقتناص عند البدء (زي الكود الأصلي)
-    log.info("🚀 جاري بدء عملية الاقتناص الأولى...")
-    asyncio.create_task(scrape_coupon_scorpion(db))
-
-    # تشغيل الـ Cron Job كل 5 دقائق (زي الكود الأصلي)
-    scheduler.add_job(
-        scrape_coupon_scorpion,
-        "interval",
-        minutes=5,
-        args=[app.state.db],
-        id="scraper_job",
-        max_instances=1,          # منع تداخل التشغيل
-        coalesce=True
-    )
-    # Scraper job - كل 5 دقائق
-    scheduler.add_job(
-        expire_old_courses,
-        "interval",
-        hours=6,
-        args=[app.state.db],
-        id="expire_job",
-        max_instances=1,
-        coalesce=True
-    )
-    scheduler.start()
-    log.info("⏰ Cron Job شغال - كل 5 دقائق")
-    log.info("⏰ Expire Job شغال - كل 6 ساعات")
+    # الـ API بيقرا بس - السكرابر والـ expire في worker.py (jobs collection)
+    # EMBEDDED_WORKER=true → نفس الـ Worker (scheduler + job loop) جوه الـ process ده
+    worker = None
+    if EMBEDDED_WORKER:
+        app.state.browser_manager = browser_manager
+        worker = Worker(db)
+        await worker.start()
+    else:
+        log.info("👷 السكرابر شغال في worker.py - الـ API بيعمل enqueue بس")
 
     yield  # ← السيرفر شغال هنا
 
     # ── إيقاف التشغيل ──
-    scheduler.shutdown(wait=False)
+    if worker:
+        await worker.stop()
+        await browser_manager.close()
+    await close_http_client()
     mongo_client.close()
     log.info("🛑 تم إيقاف السيرفر بنظافة")
 
@@ -137,6 +117,7 @@ async def db_middleware(request: Request, call_next):
 # ── Routes ──
 app.include_router(auth_router,    prefix="/api/auth")
 app.include_router(courses_router, prefix="/api/courses")
+app.include_router(admin_router,   prefix="/api/admin")
 
 # ── Health Check ──
 @app.get("/")
@@ -0,0 +1,13 @@
+"""
+Job Model
+✅ طلب تشغيل السكرابر / الـ expire من الـ admin
+"""
+
+from typing import Optional, Literal
+from pydantic import BaseModel
+
+
+class EnqueueJobRequest(BaseModel):
+    kind:  Literal["scrape", "expire"]
+    # scrape بس: مواقع محددة - فاضي = كل المواقع المفعّلة (مش بس اللي عليها الدور)
+    sites: Optional[list[str]] = None
@@ -0,0 +1,120 @@
+"""
+Admin Routes - مراقبة السكرابر
+🛡️ كل الـ routes هنا للـ admin بس (JWT + role)
+"""
+
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Request, Query, HTTPException
+from src.middlewares.auth import require_role
+from src.models.job import EnqueueJobRequest
+from src.services import jobs
+from src.services.leader import get_leader
+from src.services.circuit_breaker import get_breakers
+from src.services.scraper import SITES
+from src.services.telemetry import list_runs
+from src.services.site_schedule import get_schedule
+
+router = APIRouter(dependencies=[Depends(require_role("admin"))])
+
+
+# ──────────────────────────────────────────────
+# GET /api/admin/scraper-stats
+# ──────────────────────────────────────────────
+@router.get("/scraper-stats")
+async def scraper_stats(request: Request):
+    """
+    عدادات السكرابر (HTTP resolver / fallback ...) من كل worker
+    السكرابر شغال في worker.py - الـ worker بيكتب snapshot كل WORKER_STATUS_SECONDS وبعد كل job
+    """
+    db = request.state.db
+    data = await jobs.get_worker_status(db)
+    return {"data": data, "count": len(data)}
+
+
+# ──────────────────────────────────────────────
+# GET /api/admin/runs
+# ?kind=scrape&since=2025-01-01T00:00:00Z&until=...&limit=50
+# ──────────────────────────────────────────────
+@router.get("/runs")
+async def get_runs(
+    request: Request,
+    kind:    Optional[str]      = Query(None, pattern="^(scrape|expire)$"),
+    since:   Optional[datetime] = Query(None),
+    until:   Optional[datetime] = Query(None),
+    limit:   int                = Query(50, ge=1, le=500),
+):
+    """سجل التشغيلات (مدة كل موقع / latency الصفحات / العدادات / freshness)"""
+    db = request.state.db
+    runs = await list_runs(db, kind, since, until, limit)
+    return {"data": runs, "count": len(runs)}
+
+
+# ──────────────────────────────────────────────
+# GET /api/admin/schedule
+# ──────────────────────────────────────────────
+@router.get("/schedule")
+async def site_schedule(request: Request):
+    """الـ interval الحالي لكل موقع + السبب + موعد التشغيلة الجاية + مين الـ leader"""
+    db = request.state.db
+    return {
+        "data":   await get_schedule(db),
+        "jobs":   await jobs.get_scheduler_state(db),
+        "leader": await get_leader(db, "scheduler"),
+    }
+
+
+# ──────────────────────────────────────────────
+# GET /api/admin/breakers
+# ──────────────────────────────────────────────
+@router.get("/breakers")
+async def breakers(request: Request):
+    """حالة الـ circuit breaker لكل موقع (closed / open / half_open) + موعد المحاولة الجاية"""
+    db = request.state.db
+    return {"data": await get_breakers(db)}
+
+# ──────────────────────────────────────────────
+# POST /api/admin/jobs
+# {"kind": "scrape", "sites": ["couponscorpion"]}
+# ──────────────────────────────────────────────
+@router.post("/jobs", status_code=202)
+async def enqueue_job(body: EnqueueJobRequest, request: Request):
+    """تشغيل السكرابر / الـ expire دلوقتي - الـ worker هو اللي بينفذ"""
+    db = request.state.db
+    args = {}
+    if body.kind == "scrape":
+        unknown = [s for s in body.sites or [] if s not in SITES]
+        if unknown:
+            raise HTTPException(400, f"مواقع غير معروفة: {', '.join(unknown)}")
+        args = {"sites": body.sites} if body.sites else {"force": True}
+    job_id, created = await jobs.enqueue(db, body.kind, args, requested_by="admin")
+    return {"id": job_id, "created": created}
+
+
+# ──────────────────────────────────────────────
+# GET /api/admin/jobs?kind=scrape&status=running&limit=50
+# ──────────────────────────────────────────────
+@router.get("/jobs")
+async def list_jobs(
+    request: Request,
+    kind:    Optional[str] = Query(None, pattern="^(scrape|expire)$"),
+    status:  Optional[str] = Query(None, pattern="^(queued|running|done|failed)$"),
+    limit:   int           = Query(50, ge=1, le=500),
+):
+    db = request.state.db
+    data = await jobs.list_jobs(db, kind, status, limit)
+    return {"data": data, "count": len(data)}
+
+
+# ──────────────────────────────────────────────
+# GET /api/admin/jobs/{job_id}
+# ──────────────────────────────────────────────
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str, request: Request):
+    """حالة الـ job + النتيجة لما يخلص"""
+    db = request.state.db
+    job = await jobs.get_job(db, job_id)
+    if not job:
+        raise HTTPException(404, "الـ job مش موجود")
+    return job
@@ -0,0 +1,174 @@
+"""
+Browser Manager
+✅ browser واحد دافي بيعيش بين تشغيلات الـ scheduler (بدل launch كل 5 دقائق)
+✅ health check قبل كل تشغيل
+✅ recycle بعد BROWSER_MAX_PAGES صفحة أو لما الذاكرة تعدي BROWSER_MAX_RSS_MB
+"""
+
+import asyncio
+import os
+import time
+import logging
+from contextlib import asynccontextmanager
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+log = logging.getLogger("RILLZO")
+
+BROWSER_MAX_PAGES  = int(os.getenv("BROWSER_MAX_PAGES", 500))
+BROWSER_MAX_RSS_MB = int(os.getenv("BROWSER_MAX_RSS_MB", 1500))
+
+CHROMIUM_ARGS = ["--no-sandbox", "--disable-setuid-sandbox",
+                 "--disable-dev-shm-usage", "--disable-gpu"]
+
+
+async def create_browser():
+    try:
+        from camoufox.async_api import AsyncCamoufox
+        ctx = AsyncCamoufox(
+            headless=True,
+            os=["windows", "macos", "linux"],
+            block_images=True,
+            i_know_what_im_doing=True,
+            block_webrtc=True,
+            geoip=False,
+        )
+        return ctx, "camoufox"
+    except ImportError:
+        return None, "playwright"
+
+
+class BrowserManager:
+    """
+    مالك الـ browser طول عمر السيرفر
+
+    الاستخدام:
+        async with browser_manager.session() as browser:
+            ...
+    """
+
+    def __init__(self):
+        self.browser        = None
+        self.engine         = None
+        self._camoufox      = None
+        self._playwright    = None
+        self._lock          = asyncio.Lock()
+        self._active        = 0
+        self.launched_at    = None
+        self.launch_seconds = None
+        self.pages          = 0
+        self.launches       = 0
+        self.recycles       = 0
+        self.last_recycle   = None
+
+    async def _launch(self):
+        started = time.monotonic()
+        ctx, engine = await create_browser()
+        if engine == "camoufox" and ctx:
+            self.browser   = await ctx.__aenter__()
+            self._camoufox = ctx
+        else:
+            from playwright.async_api import async_playwright
+            self._playwright = await async_playwright().start()
+            self.browser = await self._playwright.chromium.launch(headless=True, args=CHROMIUM_ARGS)
+        self.engine         = engine
+        self.launched_at    = time.time()
+        self.launch_seconds = round(time.monotonic() - started, 2)
+        self.pages          = 0
+        self.launches      += 1
+        log.info(f"🦊 Browser جاهز ({engine}) في {self.launch_seconds}s")
+
+    async def _shutdown(self):
+        try:
+            if self._camoufox:
+                await self._camoufox.__aexit__(None, None, None)
+            elif self.browser:
+                await self.browser.close()
+        except Exception as e:
+            log.debug(f"Browser close error: {e}")
+        finally:
+            if self._playwright:
+                try: await self._playwright.stop()
+                except: pass
+            self.browser = self._camoufox = self._playwright = None
+
+    async def _healthy(self) -> bool:
+        if not self.browser or not self.browser.is_connected():
+            return False
+        try:
+            context = await asyncio.wait_for(self.browser.new_context(), timeout=15)
+            await context.close()
+            return True
+        except Exception:
+            return False
+
+    def rss_mb(self) -> float | None:
+        """ذاكرة الـ browser (كل الـ child processes)"""
+        if psutil is None:
+            return None
+        total = 0
+        for child in psutil.Process().children(recursive=True):
+            try: total += child.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied): pass
+        return round(total / 1024 / 1024, 1)
+
+    def _recycle_reason(self) -> str | None:
+        if self.pages >= BROWSER_MAX_PAGES:
+            return f"pages={self.pages}"
+        rss = self.rss_mb()
+        if rss is not None and rss >= BROWSER_MAX_RSS_MB:
+            return f"rss={rss}MB"
+        return None
+
+    async def acquire(self):
+        async with self._lock:
+            if self.browser is None:
+                await self._launch()
+            elif self._active == 0:
+                reason = None if await self._healthy() else "unhealthy"
+                reason = reason or self._recycle_reason()
+                if reason:
+                    log.info(f"♻️ Recycle للـ browser ({reason})")
+                    self.recycles    += 1
+                    self.last_recycle = reason
+                    await self._shutdown()
+                    await self._launch()
+            self._active += 1
+            return self.browser
+
+    def release(self):
+        self._active = max(0, self._active - 1)
+
+    @asynccontextmanager
+    async def session(self):
+        browser = await self.acquire()
+        try:
+            yield browser
+        finally:
+            self.release()
+
+    def record_pages(self, n: int):
+        self.pages += n
+
+    async def close(self):
+        async with self._lock:
+            await self._shutdown()
+
+    def stats(self) -> dict:
+        return {
+            "engine":         self.engine,
+            "running":        self.browser is not None,
+            "launch_seconds": self.launch_seconds,
+            "uptime_seconds": round(time.time() - self.launched_at) if self.browser else 0,
+            "pages":          self.pages,
+            "rss_mb":         self.rss_mb() if self.browser else None,
+            "launches":       self.launches,
+            "recycles":       self.recycles,
+            "last_recycle":   self.last_recycle,
+        }
+
+
+browser_manager = BrowserManager()
@@ -1,7 +1,7 @@
 """
 Smart Categories Service
 ✅ بيصنف الكورسات تلقائياً من العنوان
-✅ بيستخدم keywords ثابتة (سريع - بدون API)
+✅ بيستخدم keywords ثابتة (سريع - بدون API) - trie واحد بـ word boundaries (KeywordMatcher)
 ✅ مع fallback لـ Claude API للعناوين الصعبة
 """
 
@@ -74,7 +74,7 @@ CATEGORY_KEYWORDS = {
         "valuation", "financial modeling", "quickbooks"
     ],
     "Design & Creative": [
-        "design", "photoshop", "illustrator", "figma", "ui/ux", "ux design",
+        "design", "designer", "photoshop", "illustrator", "figma", "ui/ux", "ux design",
         "graphic design", "logo", "branding", "typography", "color theory",
         "web design", "3d", "blender", "autocad", "sketch", "adobe",
         "canva", "video editing", "premiere", "after effects", "animation"
@@ -131,25 +131,100 @@ DEFAULT_CATEGORY = "Other Courses"
 # ══════════════════════════════════════════════
 # 🔍 التصنيف بالـ Keywords (سريع)
 # ══════════════════════════════════════════════
+class KeywordMatcher:
+    """
+    كل الـ keywords في trie واحد (بيتبني مرة واحدة) بدل `kw in title` لكل keyword (~400 scan للعنوان):
+    - العنوان بيتقطع tokens مرة واحدة: كلمات (حروف / أرقام) + أي رمز لوحده ("c++" = c + +)
+      → "ai" مش جوه "email" - "sap" مش جوه "sapphire" - "r programming" مش جوه "for programming"
+    - الجمع (s / es) + أرقام في آخر الكلمة مسموحين (algorithms / classes / python3 / c++20)
+    - الـ score زي الأول: كل keyword موجود (حتى لو جوه keyword أطول) = نقطة لكل كاتيجوري فيها
+      والتعادل بيروح للكاتيجوري الأول في CATEGORY_KEYWORDS
+    """
+
+    TOKEN    = re.compile(r"[a-z0-9]+|[^a-z0-9\s]")
+    # جمع بس - "ing" / "er" كانوا بيعملوا hits غلط ("resting" → rest / "reacting" → react / "leaning" → lean)
+    SUFFIXES = ("s", "es")
+    END      = object()
+
+    def __init__(self, categories: dict):
+        self.categories = list(categories)
+        # "ai " / " ai," كانوا hacks للـ substring - الـ tokens بتغني عنهم
+        self.owners = {}
+        for index, keywords in enumerate(categories.values()):
+            for kw in keywords:
+                tokens = tuple(self.TOKEN.findall(kw.lower()))
+                if tokens and index not in self.owners.setdefault(tokens, []):
+                    self.owners[tokens].append(index)
+        self.trie  = {}
+        self.vocab = set()
+        for tokens in self.owners:
+            node = self.trie
+            for token in tokens:
+                node = node.setdefault(token, {})
+            node[self.END] = tokens
+            self.vocab.update(tokens)
+        self._forms = {}
+
+    def forms(self, token: str) -> tuple:
+        """الأشكال اللي ممكن تطابق keyword: الكلمة نفسها + من غير suffix / أرقام في الآخر"""
+        cached = self._forms.get(token)
+        if cached is None:
+            candidates = [token]
+            stem = token.rstrip("0123456789")
+            if stem and stem != token:
+                candidates.append(stem)
+            candidates += [stem[:-len(sfx)] for sfx in self.SUFFIXES if stem.endswith(sfx) and len(stem) > len(sfx) + 1]
+            cached = tuple(dict.fromkeys(c for c in candidates if c in self.vocab))
+            if len(self._forms) < 100_000:
+                self._forms[token] = cached
+        return cached
+
+    def matches(self, title: str) -> set:
+        """كل الـ keywords (tuples) الموجودة في العنوان"""
+        forms  = self._forms
+        tokens = [forms[t] if t in forms else self.forms(t) for t in self.TOKEN.findall(title.lower())]
+        found  = set()
+        for start, first in enumerate(tokens):
+            # أغلب كلمات العنوان مش أول كلمة في أي keyword
+            nodes = [self.trie[f] for f in first if f in self.trie]
+            position = start
+            while nodes:
+                for node in nodes:
+                    if self.END in node:
+                        found.add(node[self.END])
+                position += 1
+                if position == len(tokens):
+                    break
+                nodes = [node[f] for node in nodes for f in tokens[position] if f in node]
+        return found
+
+    def classify(self, title: str) -> str | None:
+        scores = [0] * len(self.categories)
+        for kw in self.matches(title or ""):
+            for index in self.owners[kw]:
+                scores[index] += 1
+        best = max(range(len(scores)), key=scores.__getitem__)
+        return self.categories[best] if scores[best] > 0 else None
+
+
+_matcher = KeywordMatcher(CATEGORY_KEYWORDS)
+
+
 def classify_by_keywords(title: str) -> str | None:
     """
     بيصنف الكورس من العنوان باستخدام keywords
     بيرجع اسم الكاتيجوري أو None لو مش واضح
     """
-    title_lower = title.lower()
+    return _matcher.classify(title)
 
-    # احسب score لكل كاتيجوري
-    scores = {}
-    for category, keywords in CATEGORY_KEYWORDS.items():
-        score = sum(1 for kw in keywords if kw in title_lower)
-        if score > 0:
-            scores[category] = score
 
-    if not scores:
-        return None
-
-    # رجّع الكاتيجوري الأعلى score
-    return max(scores, key=scores.get)
+def classify_many(titles: list) -> list:
+    """نفس classify_by_keywords لـ batch عناوين (بالترتيب) - العنوان المتكرر بيتحسب مرة"""
+    results = {}
+    for title in titles:
+        if title not in results:
+            results[title] = _matcher.classify(title)
+    return [results[title] for title in titles]
 
 
 # ══════════════════════════════════════════════
@@ -220,7 +295,11 @@ async def get_smart_category(title: str, source_category: str = None) -> str:
     category = classify_by_keywords(title)
     if category:
         return category
+    return await _fallback_category(title, source_category)
+
 
+async def _fallback_category(title: str, source_category: str = None) -> str:
+    """خطوات 2-4 في get_smart_category (لما الـ keywords ما تلاقيش حاجة)"""
     # 2. Claude API (لو مفعّل)
     if USE_CLAUDE_API and ANTHROPIC_API_KEY:
         category = await classify_by_claude(title)
@@ -251,8 +330,11 @@ async def update_existing_categories(db) -> dict:
 
     updated = skipped = 0
 
-    for course in courses:
-        new_category = await get_smart_category(
+    # الـ keywords لكل العناوين في batch واحد
+    keyword_categories = classify_many([course["title"] for course in courses])
+
+    for course, keyword_category in zip(courses, keyword_categories):
+        new_category = keyword_category or await _fallback_category(
             course["title"],
             course.get("category")
         )
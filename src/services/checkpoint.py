@@ -0,0 +1,133 @@
+"""
+Run Checkpoints (استكمال التشغيلة بعد restart)
+✅ لكل موقع شغال: صفحات الـ listing اللي خلصت + الكورسات اللي مستنية resolve + اللي اتحلت ولسه ما اتحفظتش
+✅ بيتكتب في Mongo (scrape_checkpoints) كل CHECKPOINT_SECONDS وفي آخر التشغيلة لو ما خلصتش
+✅ التشغيلة الجاية (أي process) بتكمل منه: الصفحات اللي خلصت بتتخطى والكورسات بتدخل الـ pipeline على طول
+✅ الموقع خلص عادي → الـ checkpoint بيتمسح
+✅ drain(): الـ shutdown بيوقف أي شغل جديد (صفحات / resolve) والـ pipeline بيحفظ اللي في إيده
+"""
+
+import os
+import time
+import logging
+from contextvars import ContextVar
+from datetime import datetime, timezone
+
+log = logging.getLogger("RILLZO")
+
+CHECKPOINT_SECONDS   = float(os.getenv("CHECKPOINT_SECONDS", 15))
+# checkpoint أقدم من كده بيتمسح (TTL index) - الموقع بيبدأ من الأول
+CHECKPOINT_TTL_HOURS = float(os.getenv("CHECKPOINT_TTL_HOURS", 24))
+
+COLLECTION = "scrape_checkpoints"
+
+# الـ checkpoint بتاع الموقع اللي شغال دلوقتي (كل موقع في task لوحده)
+_current: ContextVar["RunCheckpoint | None"] = ContextVar("current_checkpoint", default=None)
+
+_draining = False
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def _plain(course: dict) -> dict:
+    """من غير الحقول الداخلية (_seenAt / _page) - مالهاش معنى في process تاني"""
+    return {k: v for k, v in course.items() if not k.startswith("_")}
+
+
+class RunCheckpoint:
+    def __init__(self, site_key: str, doc: dict | None = None):
+        doc = doc or {}
+        self.site_key   = site_key
+        self.resumed    = bool(doc)
+        self.deep       = doc.get("deep")
+        self.started_at = doc.get("startedAt") or _now()
+        # الصفحات اللي خلصت في التشغيلة اللي اتقطعت - بتتخطى
+        self.skip_pages = set(doc.get("pagesDone", []))
+        self.pages_done = set(self.skip_pages)
+        self.pending    = {c["slug"]: c for c in doc.get("pending", [])}
+        self.resolved   = {item["course"]["slug"]: item for item in doc.get("resolved", [])}
+        self._written   = time.monotonic()
+
+    def resume_items(self) -> tuple[list, list]:
+        """(pending, [(course, link)]) من التشغيلة اللي اتقطعت"""
+        return list(self.pending.values()), [(item["course"], item["link"]) for item in self.resolved.values()]
+
+    def page_done(self, page: int | None):
+        if page is not None:
+            self.pages_done.add(page)
+
+    def queued(self, courses: list):
+        for course in courses:
+            self.pending[course["slug"]] = _plain(course)
+
+    def got_link(self, course: dict, link: str):
+        self.pending.pop(course["slug"], None)
+        self.resolved[course["slug"]] = {"course": _plain(course), "link": link}
+
+    def dropped(self, slug: str):
+        self.pending.pop(slug, None)
+
+    def saved(self, slug: str):
+        self.pending.pop(slug, None)
+        self.resolved.pop(slug, None)
+
+    def to_doc(self) -> dict:
+        return {
+            "deep":      self.deep,
+            "pagesDone": sorted(self.pages_done),
+            "pending":   list(self.pending.values()),
+            "resolved":  list(self.resolved.values()),
+            "startedAt": self.started_at,
+            "updatedAt": _now(),
+        }
+
+
+def use(cp: RunCheckpoint):
+    return _current.set(cp)
+
+
+def release(token):
+    _current.reset(token)
+
+
+def current() -> RunCheckpoint | None:
+    return _current.get()
+
+
+def drain():
+    """الـ process بيقفل: مفيش صفحات ولا resolve جديد - اللي اتحل بيتحفظ والباقي يفضل في الـ checkpoint"""
+    global _draining
+    _draining = True
+
+
+def draining() -> bool:
+    return _draining
+
+
+async def load(db, site_key: str) -> RunCheckpoint:
+    cp = RunCheckpoint(site_key, await db[COLLECTION].find_one({"_id": site_key}))
+    if cp.resumed:
+        log.info(
+            f"[{site_key}] ♻️ بنكمل تشغيلة اتقطعت: {len(cp.skip_pages)} صفحة خلصت | "
+            f"{len(cp.pending)} مستني resolve | {len(cp.resolved)} مستني حفظ"
+        )
+    return cp
+
+
+async def save(db, cp: RunCheckpoint, force: bool = False):
+    """force=False → مرة كل CHECKPOINT_SECONDS بالكتير"""
+    if not force and time.monotonic() - cp._written < CHECKPOINT_SECONDS:
+        return
+    cp._written = time.monotonic()
+    await db[COLLECTION].update_one({"_id": cp.site_key}, {"$set": cp.to_doc()}, upsert=True)
+
+
+async def clear(db, site_key: str):
+    await db[COLLECTION].delete_one({"_id": site_key})
+
+
+async def sites(db) -> list:
+    """المواقع اللي عندها تشغيلة ما خلصتش"""
+    return [doc["_id"] async for doc in db[COLLECTION].find({}, {"_id": 1})]
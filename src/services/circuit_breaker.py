@@ -0,0 +1,140 @@
+"""
+Circuit Breaker لكل موقع
+✅ closed: عادي - بنعد صفحات الـ listing اللي فشل تحميلها ورا بعض
+✅ open: بعد BREAKER_FAILURE_THRESHOLD فشل متتالي → باقي صفحات التشغيلة بتتلغي والموقع بيتخطى لحد retryAt
+   (الـ cooldown بيتضاعف مع كل فتح متتالي لحد BREAKER_MAX_COOLDOWN_MIN)
+✅ half_open: بعد الـ cooldown بنجرب صفحة واحدة بس - نجحت → closed / فشلت → open تاني
+✅ الحالة محفوظة في Mongo (site_breakers) عشان تعدي من تشغيلة للتانية ومن process للتاني
+"""
+
+import os
+import logging
+from contextvars import ContextVar
+from datetime import datetime, timezone, timedelta
+
+from src.services.utils import aware
+
+log = logging.getLogger("RILLZO")
+
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", 3))
+BREAKER_COOLDOWN_MINUTES  = float(os.getenv("BREAKER_COOLDOWN_MINUTES", 15))
+BREAKER_MAX_COOLDOWN_MIN  = float(os.getenv("BREAKER_MAX_COOLDOWN_MIN", 240))
+
+COLLECTION = "site_breakers"
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+# الـ breaker بتاع الموقع اللي شغال دلوقتي (كل موقع في task لوحده)
+_current: ContextVar["SiteBreaker | None"] = ContextVar("current_breaker", default=None)
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def cooldown(opens: int) -> timedelta:
+    minutes = BREAKER_COOLDOWN_MINUTES * 2 ** max(0, opens - 1)
+    return timedelta(minutes=min(minutes, BREAKER_MAX_COOLDOWN_MIN))
+
+
+class SiteBreaker:
+    def __init__(self, site_key: str, doc: dict | None = None):
+        self.site_key  = site_key
+        self.successes = 0
+        self.tripped   = False
+        self.apply(doc)
+
+    def apply(self, doc: dict | None):
+        """الحالة المحفوظة في Mongo"""
+        doc = doc or {}
+        self.state      = doc.get("state", CLOSED)
+        self.failures   = doc.get("failures", 0)
+        self.opens      = doc.get("opens", 0)
+        self.retry_at   = aware(doc.get("retryAt"))
+        self.last_error = doc.get("lastError")
+
+    def allow(self) -> bool:
+        """ينفع نشغّل الموقع دلوقتي؟ (open + الـ cooldown خلص → half_open)"""
+        if self.state != OPEN:
+            return True
+        if self.retry_at and self.retry_at > _now():
+            return False
+        self.state = HALF_OPEN
+        return True
+
+    @property
+    def probing(self) -> bool:
+        return self.state == HALF_OPEN
+
+    def record(self, ok: bool, error: str | None = None):
+        """نتيجة تحميل صفحة listing"""
+        if ok:
+            self.failures  = 0
+            self.successes += 1
+            return
+        self.failures  += 1
+        self.last_error = error or self.last_error
+        threshold = 1 if self.probing else BREAKER_FAILURE_THRESHOLD
+        if not self.tripped and self.failures >= threshold:
+            self.tripped = True
+            log.warning(f"[{self.site_key}] 🔌 الـ circuit اتفتح بعد {self.failures} فشل متتالي - باقي الصفحات اتلغت")
+
+    def finish(self):
+        """آخر التشغيلة: بنحسب الحالة الجاية"""
+        if self.tripped:
+            self.opens   += 1
+            self.state    = OPEN
+            self.retry_at = _now() + cooldown(self.opens)
+        elif self.successes:
+            self.state    = CLOSED
+            self.opens    = 0
+            self.retry_at = None
+        elif self.probing:
+            # الـ probe ما وصلش لأي صفحة (إلغاء مثلاً) → يفضل مفتوح
+            self.state = OPEN
+
+    def to_doc(self) -> dict:
+        return {
+            "state":     self.state,
+            "failures":  self.failures,
+            "opens":     self.opens,
+            "retryAt":   self.retry_at,
+            "lastError": self.last_error,
+            "updatedAt": _now(),
+        }
+
+
+def use(breaker: SiteBreaker):
+    return _current.set(breaker)
+
+
+def release(token):
+    _current.reset(token)
+
+
+def current() -> SiteBreaker | None:
+    return _current.get()
+
+
+async def restore(db, breaker: SiteBreaker):
+    breaker.apply(await db[COLLECTION].find_one({"_id": breaker.site_key}))
+
+
+async def save(db, breaker: SiteBreaker):
+    await db[COLLECTION].update_one({"_id": breaker.site_key}, {"$set": breaker.to_doc()}, upsert=True)
+
+
+async def allowed_sites(db, site_keys: list) -> list:
+    """المواقع اللي الـ circuit بتاعها مش مفتوح (أو الـ cooldown بتاعه خلص)"""
+    docs = {}
+    async for doc in db[COLLECTION].find({"_id": {"$in": site_keys}}):
+        docs[doc["_id"]] = doc
+    return [key for key in site_keys if SiteBreaker(key, docs.get(key)).allow()]
+
+
+async def get_breakers(db) -> list:
+    breakers = []
+    async for doc in db[COLLECTION].find({}).sort("_id", 1):
+        doc["site"] = doc.pop("_id")
+        breakers.append(doc)
+    return breakers
@@ -0,0 +1,94 @@
+"""
+Course Writer
+✅ بيجمع الكورسات ويحفظها بـ bulk_write (unordered) بدل update_one لكل كورس
+✅ flush لما الـ buffer يوصل BULK_SIZE أو يعدي BULK_FLUSH_SECONDS
+✅ بيرجع نتيجة كل كورس (جديد / مكرر) عشان عدادات محفوظ/متخطى تفضل مظبوطة
+"""
+
+import os
+import time
+import logging
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+log = logging.getLogger("RILLZO")
+
+BULK_SIZE          = int(os.getenv("BULK_SIZE", 50))
+BULK_FLUSH_SECONDS = float(os.getenv("BULK_FLUSH_SECONDS", 10))
+
+
+class CourseWriter:
+    """
+    الاستخدام:
+        writer = CourseWriter(db)
+        for doc, is_new in await writer.add(doc): ...
+        for doc, is_new in await writer.flush(): ...
+    """
+
+    def __init__(self, db, size: int = BULK_SIZE, flush_seconds: float = BULK_FLUSH_SECONDS):
+        self.db            = db
+        self.size          = max(1, size)
+        self.flush_seconds = flush_seconds
+        self._buffer       = []
+        self._first_at     = None
+        self.batches       = 0
+
+    def _due(self) -> bool:
+        if len(self._buffer) >= self.size:
+            return True
+        return self._first_at is not None and time.monotonic() - self._first_at >= self.flush_seconds
+
+    async def add(self, doc: dict) -> list:
+        if not self._buffer:
+            self._first_at = time.monotonic()
+        self._buffer.append(doc)
+        return await self.flush() if self._due() else []
+
+    async def flush(self) -> list:
+        """بيرجع [(doc, is_new)] لكل الكورسات اللي كانت في الـ buffer"""
+        docs, self._buffer, self._first_at = self._buffer, [], None
+        if not docs:
+            return []
+
+        # المفتاح: الكورس على udemy (courseSlug - unique index) - نفس الكورس من wrapper / موقع تاني = مكرر
+        # من غير courseSlug (لينك مش مفهوم) → الـ slug (unique كمان)
+        ops = [
+            UpdateOne(
+                {"courseSlug": doc["courseSlug"]} if doc.get("courseSlug") else {"slug": doc["slug"]},
+                {"$setOnInsert": doc},
+                upsert=True,
+            )
+            for doc in docs
+        ]
+        try:
+            result = await self.db["courses"].bulk_write(ops, ordered=False)
+            upserted = set(result.upserted_ids)
+        except BulkWriteError as e:
+            # 11000 = مكرر (slug / udemyLink) - أي حاجة تانية نسجلها
+            upserted = {u["index"] for u in e.details.get("upserted", [])}
+            for err in e.details.get("writeErrors", []):
+                if err.get("code") != 11000:
+                    log.error(f"⚠️ خطأ في الحفظ: {err.get('errmsg')}")
+        except Exception as e:
+            log.error(f"⚠️ خطأ في الحفظ: {e}")
+            upserted = set()
+
+        # نفس الكورس (courseSlug) محفوظ من موقع تاني → alsoOn
+        # (ده التأكيد بتاع الـ near-dup التقريبي: العنوان اتشابه بس الـ courseSlug هو اللي بيحكم)
+        merges = [
+            UpdateOne(
+                {"courseSlug": doc["courseSlug"], "source": {"$ne": doc["source"]}},
+                {"$addToSet": {"alsoOn": doc["source"]}},
+            )
+            for i, doc in enumerate(docs)
+            if i not in upserted and doc.get("courseSlug") and doc.get("source")
+        ]
+        if merges:
+            try:
+                await self.db["courses"].bulk_write(merges, ordered=False)
+            except Exception as e:
+                log.debug(f"⚠️ alsoOn: {e}")
+
+        self.batches += 1
+        return [(doc, i in upserted) for i, doc in enumerate(docs)]
@@ -12,6 +12,9 @@ from datetime import datetime, timezone
 
 import httpx
 
+from src.services import udemy_link
+from src.services.telemetry import RunRecorder
+
 log = logging.getLogger("RILLZO")
 
 # بعد كام يوم من الإضافة يتحقق منه
@@ -26,29 +29,42 @@ async def check_udemy_link(client: httpx.AsyncClient, udemy_url: str) -> bool:
     """
     بيتحقق إذا الكوبون لسه شغال
     ✅ لو رجع 200 = شغال
-    ❌ لو رجع 404 أو redirect لصفحة تانية = منتهي
+    ❌ لو رجع 404 أو redirect لصفحة الكورس من غير couponCode = منتهي
+
+    اللينك canonical (udemy.com/course/<slug>/?couponCode=X) → hop واحد:
+    follow_redirects=False ونبص على الـ Location بدل ما نمشي السلسلة كلها
     """
+    url = udemy_link.canonicalize(udemy_url) or udemy_url
+    one_hop = udemy_link.parse(url) is not None
     try:
         # بنبعت HEAD request خفيف مش GET كامل
         response = await client.head(
-            udemy_url,
-            follow_redirects=True,
+            url,
+            follow_redirects=not one_hop,
             timeout=REQUEST_TIMEOUT,
             headers={
                 "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
             }
         )
 
+        # لو رجع 404 أو 410 = الكورس اتحذف
+        if response.status_code in (404, 410, 403):
+            return False
+
+        if one_hop:
+            if response.is_redirect:
+                target = udemy_link.parse(str(response.url.join(response.headers.get("location", ""))))
+                # redirect لنفس صفحة الكورس من غير couponCode = الكوبون انتهى
+                if target and not target[1]:
+                    return False
+            return True
+
         final_url = str(response.url)
 
         # لو اتحول لصفحة الكورس بدون couponCode = الكوبون انتهى
         if "couponCode" not in final_url and "udemy.com/course" in final_url:
             return False
 
-        # لو رجع 404 أو 410 = الكورس اتحذف
-        if response.status_code in (404, 410, 403):
-            return False
-
         return True
 
     except Exception:
@@ -64,66 +80,75 @@ async def expire_old_courses(db) -> dict:
     log.info("🔍 بدء فحص الكورسات المنتهية...")
 
     stats = {"checked": 0, "expired": 0, "still_valid": 0, "errors": 0}
+    run = RunRecorder("expire")
+    await run.start(db)
 
-    # جلب الكورسات اللي:
-    # 1. مش expired أصلاً
-    # 2. عمرها أكبر من MAX_AGE_DAYS
-    from datetime import timedelta
-    cutoff_date = datetime.now(timezone.utc) - timedelta(days=MAX_AGE_DAYS)
-
-    cursor = db["courses"].find({
-        "expired": {"$ne": True},
-        "addedAt": {"$lt": cutoff_date}
-    }).sort("addedAt", 1)  # الأقدم الأول
-
-    courses = await cursor.to_list(length=500)
-    log.info(f"🔍 عدد الكورسات للفحص: {len(courses)}")
-
-    if not courses:
-        log.info("✅ مفيش كورسات محتاجة فحص دلوقتي")
-        return stats
-
-    # فحص بالـ batches عشان ما نحملش السيرفر
-    async with httpx.AsyncClient() as client:
-        for i in range(0, len(courses), BATCH_SIZE):
-            batch = courses[i:i + BATCH_SIZE]
-
-            # فحص الـ batch بالتوازي
-            tasks = [
-                check_udemy_link(client, course["udemyLink"])
-                for course in batch
-                if course.get("udemyLink")
-            ]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-
-            for course, is_valid in zip(batch, results):
-                stats["checked"] += 1
-
-                if isinstance(is_valid, Exception):
-                    stats["errors"] += 1
-                    continue
-
-                if not is_valid:
-                    # عمله expired=true
-                    await db["courses"].update_one(
-                        {"_id": course["_id"]},
-                        {"$set": {
-                            "expired":   True,
-                            "expiredAt": datetime.now(timezone.utc)
-                        }}
-                    )
-                    stats["expired"] += 1
-                    log.info(f"⏰ منتهي: {course['title'][:50]}")
-                else:
-                    stats["still_valid"] += 1
-
-            # استراحة بين الـ batches
-            await asyncio.sleep(1)
-
-    log.info(
-        f"✅ انتهى الفحص! "
-        f"فُحص: {stats['checked']} | "
-        f"منتهي: {stats['expired']} | "
-        f"شغال: {stats['still_valid']}"
-    )
+    # أي exception في النص → التشغيلة بتتسجل error بدل ما تفضل running
+    status = "error"
+    try:
+        # جلب الكورسات اللي:
+        # 1. مش expired أصلاً
+        # 2. عمرها أكبر من MAX_AGE_DAYS
+        from datetime import timedelta
+        cutoff_date = datetime.now(timezone.utc) - timedelta(days=MAX_AGE_DAYS)
+
+        cursor = db["courses"].find({
+            "expired": {"$ne": True},
+            "addedAt": {"$lt": cutoff_date}
+        }).sort("addedAt", 1)  # الأقدم الأول
+
+        courses = await cursor.to_list(length=500)
+        log.info(f"🔍 عدد الكورسات للفحص: {len(courses)}")
+
+        if not courses:
+            log.info("✅ مفيش كورسات محتاجة فحص دلوقتي")
+            status = "ok"
+            return stats
+
+        # فحص بالـ batches عشان ما نحملش السيرفر
+        async with httpx.AsyncClient() as client:
+            for i in range(0, len(courses), BATCH_SIZE):
+                batch = courses[i:i + BATCH_SIZE]
+
+                # فحص الـ batch بالتوازي
+                tasks = [
+                    check_udemy_link(client, course["udemyLink"])
+                    for course in batch
+                    if course.get("udemyLink")
+                ]
+                results = await asyncio.gather(*tasks, return_exceptions=True)
+
+                for course, is_valid in zip(batch, results):
+                    stats["checked"] += 1
+
+                    if isinstance(is_valid, Exception):
+                        stats["errors"] += 1
+                        continue
+
+                    if not is_valid:
+                        # عمله expired=true
+                        await db["courses"].update_one(
+                            {"_id": course["_id"]},
+                            {"$set": {
+                                "expired":   True,
+                                "expiredAt": datetime.now(timezone.utc)
+                            }}
+                        )
+                        stats["expired"] += 1
+                        log.info(f"⏰ منتهي: {course['title'][:50]}")
+                    else:
+                        stats["still_valid"] += 1
+
+                # استراحة بين الـ batches
+                await asyncio.sleep(1)
+
+        log.info(
+            f"✅ انتهى الفحص! "
+            f"فُحص: {stats['checked']} | "
+            f"منتهي: {stats['expired']} | "
+            f"شغال: {stats['still_valid']}"
+        )
+        status = "ok"
+    finally:
+        await run.finish(db, status, totals=stats)
     return stats
@@ -0,0 +1,142 @@
+"""
+HTTP Link Resolver
+✅ بيجيب صفحة التفاصيل بـ HTTP عادي (connection pool) بدل browser كامل
+✅ بيطلع رابط Udemy بنفس الـ selectors بتاعة الـ browser (selectolax - سريع جداً)
+✅ لو الموقع بلوك أو مفيش رابط → الـ scraper بيرجع للـ browser
+"""
+
+import os
+import logging
+from urllib.parse import urljoin
+
+import httpx
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:
+    HTMLParser = None
+
+log = logging.getLogger("RILLZO")
+
+HTTP_FIRST_RESOLVE   = os.getenv("HTTP_FIRST_RESOLVE", "true") == "true"
+HTTP_RESOLVE_TIMEOUT = float(os.getenv("HTTP_RESOLVE_TIMEOUT", 10))
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:128.0) Gecko/20100101 Firefox/128.0"
+)
+
+# نفس ترتيب الـ selectors في get_*_direct_link
+# (selector, لازم الرابط يحتوي على) - None = أي رابط
+DETAIL_SELECTORS = {
+    "couponscorpion": [
+        ('a.btn_offer_block.re_track_btn', None),
+        ('a[href*="udemy.com"]',           None),
+    ],
+    "onlinecourses": [
+        ('a[href*="udemy.com/course"]',            "udemy.com"),
+        ('.wp-block-button a',                     "udemy.com"),
+        ('a.elementor-button[href*="udemy"]',      "udemy.com"),
+        ('.elementor-button-wrapper a',            "udemy.com"),
+        ('a[href*="udemy"]',                       "udemy.com"),
+    ],
+    "coursevania": [
+        ('a[href*="udemy.com/course"]', "udemy.com"),
+        ('.coupon-btn a',               "udemy.com"),
+        ('a.btn[href*="udemy"]',        "udemy.com"),
+        ('.wp-block-button a',          "udemy.com"),
+        ('a[href*="udemy"]',            "udemy.com"),
+    ],
+}
+
+# علامات صفحات الحماية (Cloudflare وغيره)
+BLOCK_MARKERS = ("cf-chl", "challenge-platform", "Just a moment...", "Attention Required!")
+
+_client: httpx.AsyncClient | None = None
+# transport بديل (record / replay في الـ benchmark)
+_transport: httpx.AsyncBaseTransport | None = None
+
+# عدادات لكل موقع: http = اتحل بـ HTTP | fallback = رجعنا للـ browser | blocked = اتبلوكنا
+STATS: dict[str, dict] = {}
+
+
+def _stat(site_key: str) -> dict:
+    return STATS.setdefault(site_key, {"http": 0, "fallback": 0, "blocked": 0})
+
+
+def supports(site_key: str) -> bool:
+    return HTTP_FIRST_RESOLVE and HTMLParser is not None and site_key in DETAIL_SELECTORS
+
+
+async def set_transport(transport: httpx.AsyncBaseTransport | None):
+    """بيتطبق على الـ client الجاي - الـ client الحالي بيتقفل"""
+    global _transport
+    await close_client()
+    _transport = transport
+
+
+def get_client() -> httpx.AsyncClient:
+    """Client واحد مشترك عشان الـ keep-alive والـ connection pool"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            follow_redirects=True,
+            timeout=HTTP_RESOLVE_TIMEOUT,
+            transport=_transport,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            headers={
+                "User-Agent":      USER_AGENT,
+                "Accept":          "text/html,application/xhtml+xml",
+                "Accept-Language": "en-US,en;q=0.9",
+            },
+        )
+    return _client
+
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def extract_link(site_key: str, html: str, base_url: str) -> str | None:
+    """نفس منطق الـ page.evaluate بس على HTML ثابت"""
+    tree = HTMLParser(html)
+    for selector, must_contain in DETAIL_SELECTORS[site_key]:
+        el = tree.css_first(selector)
+        href = el.attributes.get("href") if el else None
+        if not href:
+            continue
+        href = urljoin(base_url, href)
+        if must_contain is None or must_contain in href:
+            return href
+    return None
+
+
+async def fetch_direct_link(site_key: str, detail_link: str) -> str | None:
+    """
+    بيرجع رابط Udemy أو None
+    None معناها: الـ scraper لازم يجرب الـ browser
+    """
+    stat = _stat(site_key)
+    try:
+        response = await get_client().get(detail_link)
+        html = response.text
+        if response.status_code in (403, 429, 503) or any(m in html for m in BLOCK_MARKERS):
+            stat["blocked"]  += 1
+            stat["fallback"] += 1
+            return None
+        link = extract_link(site_key, html, str(response.url))
+    except Exception as e:
+        log.debug(f"[{site_key}] HTTP resolve فشل {detail_link}: {e}")
+        link = None
+
+    if link:
+        stat["http"] += 1
+    else:
+        stat["fallback"] += 1
+    return link
+
+
+def get_stats() -> dict:
+    return {site: dict(counts) for site, counts in STATS.items()}
@@ -0,0 +1,66 @@
+"""
+MongoDB Indexes
+✅ كل الـ indexes في مكان واحد - بتتعمل مرة عند بدء التشغيل
+"""
+
+import logging
+
+from pymongo.errors import OperationFailure
+
+from src.services import udemy_link
+from src.services.checkpoint import CHECKPOINT_TTL_HOURS
+from src.services.jobs import JOB_RETENTION_DAYS, WORKER_STATUS_TTL_HOURS
+from src.services.telemetry import RUNS_RETENTION_DAYS
+
+log = logging.getLogger("RILLZO")
+
+
+async def ensure_indexes(db):
+    await db["users"].create_index("email", unique=True)
+
+    await db["courses"].create_index("slug", unique=True)
+    await db["courses"].create_index("udemyLink", unique=True)
+    # الـ dedup في السكرابر بيدور بالـ title كمان
+    await db["courses"].create_index("title")
+    # الكورس على udemy (canonical link) - الـ writer بيعمل upsert عليه → كورس واحد لكل courseSlug
+    # (الكورس اللي لينكه مش مفهوم ملهوش courseSlug - الـ writer بيعمل upsert على الـ slug)
+    info = await db["courses"].index_information()
+    if "courseSlug_unique" not in info:
+        # أول مرة: الكورسات القديمة تاخد courseSlug + المكرر منها يسيب الـ key قبل الـ unique index
+        await udemy_link.backfill(db)
+        await udemy_link.release_duplicate_keys(db)
+        if "courseSlug_1_couponCode_1" in info:
+            try:
+                await db["courses"].drop_index("courseSlug_1_couponCode_1")
+            except OperationFailure:
+                pass  # process تاني شاله
+    await db["courses"].create_index("courseSlug", name="courseSlug_unique", unique=True, sparse=True)
+    # Near-duplicate: بصمة العنوان + LSH bands (src/services/near_dup.py)
+    await db["courses"].create_index("titleKey")
+    await db["courses"].create_index("lshBands")
+
+    # كاش الـ detailLink → udemyLink - Mongo بيمسح القديم لوحده
+    await db["link_cache"].create_index("expiresAt", expireAfterSeconds=0)
+
+    # الـ storage state المحفوظة لكل موقع بتنتهي لوحدها
+    await db["site_sessions"].create_index("expiresAt", expireAfterSeconds=0)
+
+    # checkpoint تشغيلة اتقطعت وما حدش كملها - بيتمسح بعد CHECKPOINT_TTL_HOURS
+    await db["scrape_checkpoints"].create_index("updatedAt", expireAfterSeconds=int(CHECKPOINT_TTL_HOURS * 3600))
+
+    # Telemetry: الفلترة بالوقت + مسح التشغيلات القديمة
+    await db["scrape_runs"].create_index("startedAt", expireAfterSeconds=RUNS_RETENTION_DAYS * 86400)
+    await db["scrape_runs"].create_index([("kind", 1), ("startedAt", -1)])
+
+    # Jobs: الـ claim بيدور على أقدم queued + الخلصان بيتمسح بعد JOB_RETENTION_DAYS
+    await db["jobs"].create_index([("status", 1), ("createdAt", 1)])
+    # job واحد running من كل نوع - claim تاني في نفس اللحظة بيقع DuplicateKeyError
+    await db["jobs"].create_index(
+        "kind", name="one_running_per_kind", unique=True,
+        partialFilterExpression={"status": "running"},
+    )
+    await db["jobs"].create_index("finishedAt", expireAfterSeconds=JOB_RETENTION_DAYS * 86400)
+    # عدادات السكرابر من كل worker - الـ worker اللي وقف من زمان بيتمسح
+    await db["worker_status"].create_index("updatedAt", expireAfterSeconds=int(WORKER_STATUS_TTL_HOURS * 3600))
+
+    log.info("🗂️ الـ Indexes جاهزة")
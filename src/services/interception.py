@@ -0,0 +1,105 @@
+"""
+Request Interception
+✅ بيمنع الـ resources التقيلة (صور / فيديو / خطوط / CSS) والـ ads / analytics
+✅ قواعد allow / deny لكل موقع بنوع الـ resource والدومين
+✅ شغال على Camoufox و Chromium (page.route)
+✅ عدادات للطلبات الممنوعة والـ bytes اللي وفرناها (تقديري)
+"""
+
+import os
+from urllib.parse import urlparse
+
+BLOCK_RESOURCES = os.getenv("BLOCK_RESOURCES", "true") == "true"
+
+HEAVY_TYPES = {"image", "media", "font", "stylesheet"}
+
+# Ads / analytics / embeds - ممنوعة في كل المواقع
+DENY_DOMAINS = (
+    "doubleclick.net", "googlesyndication.com", "googleadservices.com",
+    "google-analytics.com", "googletagmanager.com", "adservice.google.com",
+    "facebook.net", "facebook.com", "connect.facebook.net", "hotjar.com",
+    "clarity.ms", "scorecardresearch.com", "quantserve.com", "amazon-adsystem.com",
+    "taboola.com", "outbrain.com", "popads.net", "propellerads.com", "adsterra.com",
+    "onesignal.com", "pushnami.com", "disqus.com", "gravatar.com", "addtoany.com",
+    "sharethis.com", "twitter.com", "platform.twitter.com", "pinterest.com",
+    "youtube.com", "ytimg.com", "vimeo.com", "cloudflareinsights.com",
+)
+
+# مسموحة دايماً (challenges الحماية لازم تشتغل)
+ALLOW_DOMAINS = ("challenges.cloudflare.com",)
+
+SITE_RULES = {
+    "couponscorpion": {"block_types": HEAVY_TYPES,                   "deny_domains": ()},
+    # SPA (MUI): الـ CSS-in-JS بيتحقن inline - بس نسيب الـ scripts والـ XHR
+    "real_discount":  {"block_types": {"image", "media", "font"},    "deny_domains": ()},
+    "onlinecourses":  {"block_types": HEAVY_TYPES,                   "deny_domains": ()},
+    "coursevania":    {"block_types": HEAVY_TYPES,                   "deny_domains": ()},
+}
+DEFAULT_RULE = {"block_types": HEAVY_TYPES, "deny_domains": ()}
+
+# متوسط حجم تقريبي لكل نوع (bytes) - للتقدير بس
+AVG_BYTES = {
+    "image": 60_000, "media": 500_000, "font": 40_000, "stylesheet": 30_000,
+    "script": 80_000, "xhr": 5_000, "fetch": 5_000, "document": 50_000,
+}
+
+STATS: dict[str, dict] = {}
+
+# handler إضافي بيستلم الطلبات المسموحة (record / replay في الـ benchmark)
+_override = None
+
+
+def set_override(handler):
+    """handler(route, request) - None يلغيه"""
+    global _override
+    _override = handler
+
+
+def _stat(site_key: str) -> dict:
+    return STATS.setdefault(site_key, {"allowed": 0, "blocked": 0, "est_bytes_saved": 0, "by_type": {}})
+
+
+def _host_matches(host: str, domains) -> bool:
+    return any(host == d or host.endswith("." + d) for d in domains)
+
+
+def should_block(site_key: str, resource_type: str, url: str, is_main_document: bool = False) -> bool:
+    if is_main_document:
+        return False
+    host = urlparse(url).netloc.lower().split(":")[0]
+    if _host_matches(host, ALLOW_DOMAINS):
+        return False
+    rule = SITE_RULES.get(site_key, DEFAULT_RULE)
+    if resource_type in rule["block_types"]:
+        return True
+    return _host_matches(host, DENY_DOMAINS + tuple(rule["deny_domains"]))
+
+
+async def install(page, site_key: str):
+    """بيتنده من الـ PagePool على كل صفحة جديدة وبعد كل reset"""
+    # Playwright بيجرب الـ handlers بالعكس: الـ override الأول عشان ياخد اللي الـ blocker سابه
+    if _override:
+        await page.route("**/*", _override)
+    if not BLOCK_RESOURCES:
+        return
+    stat = _stat(site_key)
+
+    async def _handle(route, request):
+        try:
+            main_doc = request.is_navigation_request() and request.frame.parent_frame is None
+        except Exception:
+            main_doc = False
+        if should_block(site_key, request.resource_type, request.url, main_doc):
+            stat["blocked"] += 1
+            stat["est_bytes_saved"] += AVG_BYTES.get(request.resource_type, 10_000)
+            stat["by_type"][request.resource_type] = stat["by_type"].get(request.resource_type, 0) + 1
+            await route.abort()
+        else:
+            stat["allowed"] += 1
+            await route.fallback()
+
+    await page.route("**/*", _handle)
+
+
+def get_stats() -> dict:
+    return {site: {**counts, "by_type": dict(counts["by_type"])} for site, counts in STATS.items()}
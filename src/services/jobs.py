@@ -0,0 +1,408 @@
+"""
+Job Queue (MongoDB)
+✅ الـ API بيعمل enqueue بس - الـ worker (worker.py) هو اللي بيشغّل السكرابر والـ expire
+✅ claim بـ lease: لو الـ worker وقع الـ lease بيخلص والـ job يرجع لأي worker تاني
+✅ job واحد بس running من كل نوع في نفس الوقت (كل الـ processes) - unique partial index على kind
+✅ heartbeat بيمد الـ lease طول ما الـ job شغال - ولو الـ lease ضاع الـ job بيتلغي
+✅ النتيجة / الخطأ بيتحفظوا في نفس الـ document (GET /api/admin/jobs/{id})
+✅ عدادات السكرابر بتتكتب في worker_status (GET /api/admin/scraper-stats) - الـ API مالوش ذاكرة السكرابر
+✅ Graceful shutdown: الـ job الحالي بياخد SHUTDOWN_DRAIN_SECONDS يخلص اللي في إيده
+   وبعدين بيرجع queued (الـ scrape بيكمل من الـ checkpoint في الـ process الجاي)
+"""
+
+import asyncio
+import os
+import socket
+import logging
+from datetime import datetime, timezone, timedelta
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+from src.services.leader import LEADER_RENEW_SECONDS, LeaderLease
+from src.services.utils import aware
+
+log = logging.getLogger("RILLZO")
+
+# مدة الـ lease - لو الـ worker ما عملش heartbeat خلالها الـ job يتاخد تاني
+JOB_LEASE_SECONDS     = int(os.getenv("JOB_LEASE_SECONDS", 120))
+JOB_HEARTBEAT_SECONDS = int(os.getenv("JOB_HEARTBEAT_SECONDS", 30))
+JOB_POLL_SECONDS      = float(os.getenv("JOB_POLL_SECONDS", 2))
+JOB_MAX_ATTEMPTS      = int(os.getenv("JOB_MAX_ATTEMPTS", 3))
+# الـ jobs الخلصانة بتتمسح بعد كده (TTL index)
+JOB_RETENTION_DAYS    = int(os.getenv("JOB_RETENTION_DAYS", 7))
+EXPIRE_INTERVAL_HOURS = float(os.getenv("EXPIRE_INTERVAL_HOURS", 6))
+# لازم يكون أقل من مهلة الـ stop بتاعة الـ container (Docker: 10 ثواني افتراضياً)
+SHUTDOWN_DRAIN_SECONDS = float(os.getenv("SHUTDOWN_DRAIN_SECONDS", 8))
+# كل قد إيه الـ worker بيكتب عدادات السكرابر في worker_status (الـ API بيقرا منها)
+WORKER_STATUS_SECONDS  = float(os.getenv("WORKER_STATUS_SECONDS", 30))
+# worker ما كتبش من المدة دي بيتمسح (TTL index)
+WORKER_STATUS_TTL_HOURS = float(os.getenv("WORKER_STATUS_TTL_HOURS", 24))
+
+COLLECTION = "jobs"
+# آخر / جاي تشغيل لكل periodic job - عشان الـ restart ما يعيدش اللي اتعمل
+SCHEDULE_COLLECTION = "scheduler_state"
+# snapshot لعدادات السكرابر لكل worker - العدادات في ذاكرة الـ worker مش الـ API
+STATUS_COLLECTION = "worker_status"
+KINDS = ("scrape", "expire")
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def _public(doc: dict) -> dict:
+    doc["id"] = str(doc.pop("_id"))
+    return doc
+
+
+async def enqueue(db, kind: str, args: dict | None = None, requested_by: str = "scheduler") -> tuple[str, bool]:
+    """
+    بيرجع (job_id, created)
+    لو فيه job من نفس النوع ونفس الـ args لسه مستني أو شغال بنرجعه بدل ما نكرر
+    (الـ tick بيلاقي المواقع عليها الدور طول ما السكرابر شغال)
+    الـ job نفسه مش fenced - الـ leader بيكتب في scheduler_state بالـ token الأول (_mark) وبعدين بس يعمل enqueue
+    """
+    if kind not in KINDS:
+        raise ValueError(f"نوع job غير معروف: {kind}")
+    args = args or {}
+    existing = await db[COLLECTION].find_one(
+        {"kind": kind, "args": args, "status": {"$in": ["queued", "running"]}}, {"_id": 1}
+    )
+    if existing:
+        return str(existing["_id"]), False
+    result = await db[COLLECTION].insert_one({
+        "kind":        kind,
+        "args":        args,
+        "status":      "queued",
+        "requestedBy": requested_by,
+        "attempts":    0,
+        "createdAt":   _now(),
+    })
+    return str(result.inserted_id), True
+
+
+async def claim(db, owner: str, kinds=KINDS) -> dict | None:
+    """
+    أقدم job مستني - أو job شغال الـ lease بتاعه خلص (worker وقع)
+    النوع اللي عنده job شغال بـ lease حي مش بيتاخد منه جديد (browser / checkpoints واحدة لكل نوع)
+    """
+    now = _now()
+    # job وقّع workers كتير → failed بدل ما يفضل يتاخد للأبد
+    await db[COLLECTION].update_many(
+        {"status": "running", "leaseUntil": {"$lt": now}, "attempts": {"$gte": JOB_MAX_ATTEMPTS}},
+        {"$set": {"status": "failed", "error": "lease expired", "finishedAt": now, "leaseUntil": None}},
+    )
+    busy  = set(await db[COLLECTION].distinct("kind", {"status": "running", "leaseUntil": {"$gte": now}}))
+    kinds = [kind for kind in kinds if kind not in busy]
+    if not kinds:
+        return None
+    # الـ running اللي الـ lease بتاعه خلص الأول: لسه ماسك مكان النوع ده في الـ unique index
+    for status_filter in ({"status": "running", "leaseUntil": {"$lt": now}}, {"status": "queued"}):
+        try:
+            job = await db[COLLECTION].find_one_and_update(
+                {"kind": {"$in": kinds}, "attempts": {"$lt": JOB_MAX_ATTEMPTS}, **status_filter},
+                {
+                    "$set": {
+                        "status":     "running",
+                        "owner":      owner,
+                        "startedAt":  now,
+                        "heartbeatAt": now,
+                        "leaseUntil": now + timedelta(seconds=JOB_LEASE_SECONDS),
+                    },
+                    "$inc": {"attempts": 1},
+                },
+                sort=[("createdAt", 1)],
+                return_document=ReturnDocument.AFTER,
+            )
+        except DuplicateKeyError:
+            # process تاني أخد job من نفس النوع في نفس اللحظة (أو لسه فيه running قديم)
+            continue
+        if job:
+            return job
+    return None
+
+
+async def heartbeat(db, job_id, owner: str) -> bool:
+    """False = الـ lease راح لـ worker تاني"""
+    now = _now()
+    result = await db[COLLECTION].update_one(
+        {"_id": job_id, "owner": owner, "status": "running"},
+        {"$set": {"heartbeatAt": now, "leaseUntil": now + timedelta(seconds=JOB_LEASE_SECONDS)}},
+    )
+    return result.matched_count == 1
+
+
+async def complete(db, job_id, owner: str, result=None, error: str | None = None):
+    await db[COLLECTION].update_one(
+        {"_id": job_id, "owner": owner},
+        {"$set": {
+            "status":     "failed" if error else "done",
+            "result":     result,
+            "error":      error,
+            "finishedAt": _now(),
+            "leaseUntil": None,
+        }},
+    )
+
+
+async def requeue(db, job_id, owner: str):
+    """الـ job اتقطع بسبب shutdown - يرجع للطابور من غير ما يتحسب محاولة"""
+    await db[COLLECTION].update_one(
+        {"_id": job_id, "owner": owner, "status": "running"},
+        {
+            "$set": {"status": "queued", "owner": None, "leaseUntil": None, "interruptedAt": _now()},
+            "$inc": {"attempts": -1},
+        },
+    )
+
+
+async def get_job(db, job_id: str) -> dict | None:
+    if not ObjectId.is_valid(job_id):
+        return None
+    doc = await db[COLLECTION].find_one({"_id": ObjectId(job_id)})
+    return _public(doc) if doc else None
+
+
+async def list_jobs(db, kind: str | None = None, status: str | None = None, limit: int = 50) -> list:
+    filt = {}
+    if kind:   filt["kind"]   = kind
+    if status: filt["status"] = status
+    return [_public(doc) async for doc in db[COLLECTION].find(filt).sort("createdAt", -1).limit(limit)]
+
+
+async def get_scheduler_state(db) -> list:
+    return [_public(doc) async for doc in db[SCHEDULE_COLLECTION].find({}).sort("_id", 1)]
+
+
+async def get_worker_status(db) -> list:
+    """آخر snapshot من كل worker (الأحدث الأول)"""
+    return [_public(doc) async for doc in db[STATUS_COLLECTION].find({}).sort("updatedAt", -1)]
+
+
+# ══════════════════════════════════════════════
+# 👷 Worker
+# ══════════════════════════════════════════════
+async def _run_scrape(db, args: dict):
+    from src.services.scraper import enabled_sites, scrape_coupon_scorpion
+    sites = args.get("sites")
+    if not sites and args.get("force"):
+        sites = enabled_sites()
+    return await scrape_coupon_scorpion(db, sites)
+
+
+async def _run_expire(db, args: dict):
+    from src.services.expire import expire_old_courses
+    return await expire_old_courses(db)
+
+
+HANDLERS = {"scrape": _run_scrape, "expire": _run_expire}
+
+
+class Worker:
+    """
+    بيشغّل الـ scheduler (enqueue دوري) + loop بيعمل claim وبينفّذ job واحد في المرة
+    (الـ browser واحد - مفيش داعي لأكتر من job في نفس الوقت)
+
+    أي عدد workers / API processes ممكن يشتغلوا مع بعض:
+    - الـ claim بالـ lease → كل job بيتنفذ مرة واحدة
+    - الـ enqueue الدوري للـ leader بس (LeaderLease) - والمواعيد محفوظة في scheduler_state
+
+    الاستخدام:
+        worker = Worker(db)
+        await worker.start()
+        ...
+        await worker.stop()
+    """
+
+    def __init__(self, db):
+        self.db        = db
+        self.owner     = f"{socket.gethostname()}:{os.getpid()}"
+        self.scheduler = None
+        self.lease     = LeaderLease(db, "scheduler", self.owner)
+        self._fenced   = None
+        self._task     = None
+        self._job      = None
+        self._current  = None
+        self._stopping = asyncio.Event()
+
+    async def start(self):
+        from src.services.site_schedule import SCHEDULER_TICK_MINUTES
+
+        # الـ scheduler بيعمل enqueue بس (لو إحنا الـ leader) - التنفيذ في الـ loop
+        # أول tick على طول: لو فيه حاجة عليها الدور تتعمل - غير كده مفيش boot scrape
+        self.scheduler = AsyncIOScheduler()
+        self.scheduler.add_job(
+            self._renew, "interval", seconds=LEADER_RENEW_SECONDS,
+            id="leader_lease", max_instances=1, coalesce=True
+        )
+        self.scheduler.add_job(
+            self._tick, "interval", minutes=SCHEDULER_TICK_MINUTES, next_run_time=_now(),
+            id="scheduler_tick", max_instances=1, coalesce=True
+        )
+        self.scheduler.add_job(
+            self._publish, "interval", seconds=WORKER_STATUS_SECONDS, next_run_time=_now(),
+            id="worker_status", max_instances=1, coalesce=True
+        )
+        self.scheduler.start()
+
+        self._task = asyncio.create_task(self._loop())
+        log.info(f"👷 Worker شغال ({self.owner}) - tick كل {SCHEDULER_TICK_MINUTES} دقيقة")
+
+    async def _renew(self):
+        try:
+            await self.lease.try_acquire()
+        except Exception as e:
+            log.warning(f"👑 فشل تجديد الـ lease: {e}")
+
+    async def _publish(self, running: bool = True):
+        """عدادات السكرابر (get_scraper_stats) → worker_status - GET /api/admin/scraper-stats بيقرا منها"""
+        from src.services.scraper import get_scraper_stats
+
+        job = self._current
+        try:
+            await self.db[STATUS_COLLECTION].update_one(
+                {"_id": self.owner},
+                {"$set": {
+                    "running":   running,
+                    "job":       {"id": str(job["_id"]), "kind": job["kind"]} if job else None,
+                    "stats":     get_scraper_stats(),
+                    "updatedAt": _now(),
+                }},
+                upsert=True,
+            )
+        except Exception as e:
+            log.warning(f"👷 فشل تسجيل الـ worker status: {e}")
+
+    async def _mark(self, job_id: str, next_run=None) -> bool:
+        """
+        بيسجل إن الـ job اتعمله enqueue - بالـ fencing token
+        لو leader أحدث كتب قبلنا (fence أكبر) الكتابة بتترفض ونتنحى
+        """
+        token = self.lease.token
+        try:
+            await self.db[SCHEDULE_COLLECTION].update_one(
+                {"_id": job_id, "$or": [{"fence": {"$lte": token}}, {"fence": {"$exists": False}}]},
+                {"$set": {"lastEnqueuedAt": _now(), "nextRunAt": next_run, "fence": token, "owner": self.owner}},
+                upsert=True,
+            )
+            return True
+        except DuplicateKeyError:
+            log.warning(f"👑 token {token} قديم - leader تاني مسك الـ scheduler")
+            self.lease.step_down()
+            return False
+
+    async def _tick(self):
+        from src.services.scraper import runnable_sites
+
+        await self._renew()
+        if not self.lease.is_leader:
+            return
+        try:
+            now   = _now()
+            token = self.lease.token
+            if self._fenced != token:
+                # leader جديد: نرفع الـ fence على كل المواعيد → كتابات الـ leader القديم تترفض
+                await self.db[SCHEDULE_COLLECTION].update_many(
+                    {"fence": {"$lt": token}}, {"$set": {"fence": token, "owner": self.owner}}
+                )
+                self._fenced = token
+            state = await self.db[SCHEDULE_COLLECTION].find_one({"_id": "expire_job"}) or {}
+            if not state.get("nextRunAt") or aware(state["nextRunAt"]) <= now:
+                if await self._mark("expire_job", now + timedelta(hours=EXPIRE_INTERVAL_HOURS)):
+                    await enqueue(self.db, "expire")
+            # السكرابر: كل موقع ليه موعده في site_schedule (محفوظ) - مفيش job لو مفيش موقع عليه الدور
+            # (أو كل اللي عليهم الدور الـ circuit بتاعهم مفتوح)
+            if self.lease.is_leader and await runnable_sites(self.db):
+                if await self._mark("scraper_job"):
+                    await enqueue(self.db, "scrape")
+        except Exception as e:
+            log.warning(f"⏰ فشل الـ scheduler tick: {e}")
+
+    async def _loop(self):
+        while not self._stopping.is_set():
+            try:
+                job = await claim(self.db, self.owner)
+            except Exception as e:
+                log.warning(f"👷 فشل الـ claim: {e}")
+                job = None
+            if not job:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=JOB_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._execute(job)
+
+    async def _execute(self, job: dict):
+        log.info(f"👷 job {job['_id']} ({job['kind']}) - محاولة {job['attempts']}")
+        self._current = job
+        task = self._job = asyncio.create_task(HANDLERS[job["kind"]](self.db, job.get("args") or {}))
+
+        async def _beat():
+            while True:
+                await asyncio.sleep(JOB_HEARTBEAT_SECONDS)
+                if not await heartbeat(self.db, job["_id"], self.owner):
+                    log.warning(f"👷 الـ lease بتاع {job['_id']} ضاع - بنلغي الـ job")
+                    task.cancel()
+                    return
+
+        beat = asyncio.create_task(_beat())
+        result, error = None, None
+        try:
+            result = await task
+        except asyncio.CancelledError:
+            error = "cancelled"
+            if not task.cancelled():
+                raise
+        except Exception as e:
+            error = str(e)
+            log.error(f"👷 job {job['_id']} فشل: {e}")
+        finally:
+            beat.cancel()
+            self._job = self._current = None
+        interrupted = self._stopping.is_set() and (
+            task.cancelled() or (isinstance(result, dict) and result.get("status") == "interrupted")
+        )
+        try:
+            if interrupted:
+                log.info(f"👷 job {job['_id']} رجع الطابور (shutdown)")
+                await requeue(self.db, job["_id"], self.owner)
+            else:
+                await complete(self.db, job["_id"], self.owner, result, error)
+        except Exception as e:
+            log.warning(f"👷 فشل تسجيل نتيجة {job['_id']}: {e}")
+        await self._publish()
+
+    async def stop(self, drain_seconds: float = SHUTDOWN_DRAIN_SECONDS):
+        """
+        مفيش claim جديد + الـ job الحالي بيعمل drain (الصفحات / الـ resolve اللي شغالة بتخلص وتتحفظ)
+        لو عدى drain_seconds بيتلغي - وفي الحالتين الـ checkpoint بيتحفظ والـ job يرجع queued
+        """
+        from src.services import checkpoint
+
+        self._stopping.set()
+        if self.scheduler:
+            self.scheduler.shutdown(wait=False)
+        job = self._job
+        if job and not job.done():
+            log.info(f"👷 بنستنى الـ job الحالي يخلص اللي في إيده (أقصى {drain_seconds:g} ثانية)")
+            checkpoint.drain()
+            await asyncio.wait({job}, timeout=drain_seconds)
+            if not job.done():
+                log.warning("👷 الـ drain عدى الـ deadline - بنلغي الـ job (الـ checkpoint بيتحفظ)")
+                job.cancel()
+        if self._task:
+            # الـ loop بيسجل نتيجة الـ job (أو يرجعه الطابور) وبيخرج
+            await asyncio.wait({self._task}, timeout=10)
+            if not self._task.done():
+                self._task.cancel()
+                try: await self._task
+                except asyncio.CancelledError: pass
+        await self._publish(running=False)
+        try:
+            await self.lease.release()
+        except Exception as e:
+            log.warning(f"👑 فشل تسليم الـ lease: {e}")
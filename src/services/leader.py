@@ -0,0 +1,110 @@
+"""
+Leader Lease (MongoDB)
+✅ process واحد بس (من كل الـ uvicorn workers / الـ replicas) بيملك الـ scheduler في أي وقت
+✅ الـ lease ليه مدة (LEADER_LEASE_SECONDS) - لو الـ leader وقع أي process تاني ياخده بعدها
+✅ Fencing token: رقم بيزيد مع كل leader جديد - الكتابات اللي معاها token قديم بتترفض
+"""
+
+import os
+import time
+import logging
+from datetime import datetime, timezone, timedelta
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from src.services.utils import aware
+
+log = logging.getLogger("RILLZO")
+
+LEADER_LEASE_SECONDS = int(os.getenv("LEADER_LEASE_SECONDS", 60))
+# لازم يكون أقل بكتير من مدة الـ lease
+LEADER_RENEW_SECONDS = int(os.getenv("LEADER_RENEW_SECONDS", 20))
+
+COLLECTION = "leases"
+
+
+class LeaderLease:
+    """
+    الاستخدام:
+        lease = LeaderLease(db, "scheduler", owner)
+        if await lease.try_acquire():
+            ... lease.token ...
+        await lease.release()
+    """
+
+    def __init__(self, db, name: str, owner: str, ttl: int = LEADER_LEASE_SECONDS):
+        self.db     = db
+        self.name   = name
+        self.owner  = owner
+        self.ttl    = ttl
+        self.token  = None
+        self._valid_until = 0.0
+
+    @property
+    def is_leader(self) -> bool:
+        """محلياً: عندنا token والـ lease لسه ما خلصش (من غير round-trip)"""
+        return self.token is not None and time.monotonic() < self._valid_until
+
+    async def try_acquire(self) -> bool:
+        """تجديد لو إحنا الـ leader - أو أخد الـ lease لو فاضي / خلص"""
+        # الوقت المحلي بيتحسب قبل الطلب عشان نفضل في الأمان
+        started = time.monotonic()
+        now     = datetime.now(timezone.utc)
+        until   = now + timedelta(seconds=self.ttl)
+        coll    = self.db[COLLECTION]
+
+        doc = None
+        if self.token is not None:
+            doc = await coll.find_one_and_update(
+                {"_id": self.name, "owner": self.owner, "token": self.token},
+                {"$set": {"leaseUntil": until, "renewedAt": now}},
+                return_document=ReturnDocument.AFTER,
+            )
+        if doc is None:
+            try:
+                doc = await coll.find_one_and_update(
+                    {"_id": self.name, "leaseUntil": {"$lt": now}},
+                    {
+                        "$set": {"owner": self.owner, "leaseUntil": until, "acquiredAt": now, "renewedAt": now},
+                        "$inc": {"token": 1},
+                    },
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER,
+                )
+            except DuplicateKeyError:
+                # الـ lease موجود ومع process تاني
+                doc = None
+
+        if doc is None:
+            if self.token is not None:
+                log.warning(f"👑 خسرنا الـ lease بتاع {self.name}")
+            self.token = None
+            return False
+        if doc["token"] != self.token:
+            log.info(f"👑 بقينا الـ leader لـ {self.name} (token {doc['token']})")
+        self.token = doc["token"]
+        self._valid_until = started + self.ttl
+        return True
+
+    def step_down(self):
+        self.token = None
+
+    async def release(self):
+        if self.token is None:
+            return
+        await self.db[COLLECTION].update_one(
+            {"_id": self.name, "owner": self.owner, "token": self.token},
+            {"$set": {"leaseUntil": datetime.now(timezone.utc)}},
+        )
+        self.token = None
+
+
+async def get_leader(db, name: str) -> dict | None:
+    doc = await db[COLLECTION].find_one({"_id": name})
+    if not doc:
+        return None
+    until = aware(doc.get("leaseUntil"))
+    doc["active"] = bool(until and until > datetime.now(timezone.utc))
+    doc["name"] = doc.pop("_id")
+    return doc
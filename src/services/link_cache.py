@@ -0,0 +1,92 @@
+"""
+Link Cache (detailLink → udemyLink)
+✅ الروابط اللي اتحلت بتتخزن - مش بنفتح نفس صفحة التفاصيل تاني
+✅ الفشل بيتخزن كمان (negative cache) مع backoff أُسّي قبل المحاولة الجاية
+✅ عدادات hit / miss / negative_hit لكل موقع
+"""
+
+import os
+from datetime import datetime, timezone, timedelta
+
+from pymongo import UpdateOne
+
+from src.services.utils import aware
+
+# عمر الـ entry في الكاش (الـ TTL index بيمسحها بعد كده)
+LINK_CACHE_TTL_DAYS      = int(os.getenv("LINK_CACHE_TTL_DAYS", 7))
+# أول backoff بعد فشل - وبيتضاعف مع كل فشل لحد الـ max
+NEGATIVE_BACKOFF_MINUTES = int(os.getenv("NEGATIVE_BACKOFF_MINUTES", 30))
+NEGATIVE_BACKOFF_MAX_HRS = int(os.getenv("NEGATIVE_BACKOFF_MAX_HRS", 48))
+
+COLLECTION = "link_cache"
+
+STATS: dict[str, dict] = {}
+
+
+def _stat(site_key: str) -> dict:
+    return STATS.setdefault(site_key, {"hit": 0, "miss": 0, "negative_hit": 0})
+
+
+def backoff(failures: int) -> timedelta:
+    minutes = NEGATIVE_BACKOFF_MINUTES * (2 ** max(0, failures - 1))
+    return min(timedelta(minutes=minutes), timedelta(hours=NEGATIVE_BACKOFF_MAX_HRS))
+
+
+async def split_cached(db, site_key: str, courses: list):
+    """
+    بيقسم الكورسات لـ 3:
+    - cached:   [(course, udemyLink)] اتحلت قبل كده
+    - pending:  محتاجة تتحل
+    - negative: عدد اللي فشلت قريب ولسه في الـ backoff
+    """
+    stat  = _stat(site_key)
+    links = [c["detailLink"] for c in courses]
+    docs  = {}
+    if links:
+        async for doc in db[COLLECTION].find({"_id": {"$in": links}}):
+            docs[doc["_id"]] = doc
+
+    now = datetime.now(timezone.utc)
+    cached, pending, negative = [], [], 0
+    for course in courses:
+        doc = docs.get(course["detailLink"])
+        if doc and doc.get("udemyLink"):
+            stat["hit"] += 1
+            cached.append((course, doc["udemyLink"]))
+        elif doc and aware(doc.get("retryAt")) and aware(doc["retryAt"]) > now:
+            stat["negative_hit"] += 1
+            negative += 1
+        else:
+            stat["miss"] += 1
+            pending.append(course)
+    return cached, pending, negative
+
+
+async def record_results(db, site_key: str, results: list):
+    """results: [(detailLink, udemyLink | None)] - write واحد لكل الـ batch"""
+    if not results:
+        return
+    now     = datetime.now(timezone.utc)
+    expires = now + timedelta(days=LINK_CACHE_TTL_DAYS)
+    failed  = [link for link, udemy in results if not udemy]
+
+    failures = {}
+    if failed:
+        async for doc in db[COLLECTION].find({"_id": {"$in": failed}}, {"failures": 1}):
+            failures[doc["_id"]] = doc.get("failures", 0)
+
+    ops = []
+    for link, udemy in results:
+        if udemy:
+            update = {"site": site_key, "udemyLink": udemy, "failures": 0,
+                      "retryAt": None, "updatedAt": now, "expiresAt": expires}
+        else:
+            count  = failures.get(link, 0) + 1
+            update = {"site": site_key, "udemyLink": None, "failures": count,
+                      "retryAt": now + backoff(count), "updatedAt": now, "expiresAt": expires}
+        ops.append(UpdateOne({"_id": link}, {"$set": update}, upsert=True))
+    await db[COLLECTION].bulk_write(ops, ordered=False)
+
+
+def get_stats() -> dict:
+    return {site: dict(counts) for site, counts in STATS.items()}
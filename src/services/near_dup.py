@@ -0,0 +1,265 @@
+"""
+Near-Duplicate Detection (قبل فتح صفحة التفاصيل)
+✅ نفس كورس Udemy بيظهر في المواقع الأربعة بعناوين مختلفة شوية:
+   "[2024]" / "- 100% OFF" / علامات ترقيم مختلفة → slugify و الـ title match مش بيمسكوهم
+✅ titleKey: بصمة للعنوان بعد الـ normalize (تطابق تام) - ده بس اللي بيتخطى قبل الـ resolve
+✅ MinHash + LSH على char shingles: تشابه تقريبي (NEAR_DUP_THRESHOLD) = مرشح بس
+   ("Python for Data Science" و "R for Data Science" بيعدوا الـ threshold) - الكورس بيتحل عادي
+   والتأكيد بعد الـ resolve بالـ courseSlug (الـ CourseWriter: unique index + alsoOn)
+✅ الـ index في الذاكرة (الكورسات اللي لسه بتتحل في المواقع الشغالة بالتوازي) + في Mongo (lshBands على courses)
+"""
+
+import hashlib
+import os
+import random
+import re
+import logging
+from collections import OrderedDict
+
+from pymongo import UpdateOne
+
+log = logging.getLogger("RILLZO")
+
+# أقل تشابه (Jaccard تقريبي) نعتبر عنده الكورسين واحد
+NEAR_DUP_THRESHOLD = float(os.getenv("NEAR_DUP_THRESHOLD", 0.8))
+# أقصى عدد عناوين في الـ index اللي في الذاكرة
+NEAR_DUP_MEMORY    = int(os.getenv("NEAR_DUP_MEMORY", 20_000))
+
+# عنوان أقصر من كده بعد الـ normalize مش بصمة كفاية - مش بيتقارن بحاجة
+MIN_NORM_CHARS = int(os.getenv("NEAR_DUP_MIN_CHARS", 8))
+
+# بيزيد لما الـ normalize يتغير → الـ backfill بيعيد حساب البصمات القديمة
+FINGERPRINT_VERSION = 2
+
+NUM_PERM   = 64
+BANDS      = 16
+ROWS       = NUM_PERM // BANDS
+SHINGLE    = 4
+_PRIME     = (1 << 61) - 1
+_rng       = random.Random(1337)
+_PERMS     = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+# كلام الإعلانات اللي المواقع بتلزقه في العنوان
+_BRACKETS = re.compile(r"[\[\(\{][^\]\)\}]*[\]\)\}]")
+_PROMO    = re.compile(
+    r"\b(\d{1,3}\s*%\s*off|free|coupon|discount|udemy|course|updated|"
+    r"(19|20)\d{2}|limited time|100 off)\b"
+)
+# Unicode: عربي / ياباني / روسي بيفضلوا (مش بس a-z)
+_NON_WORD = re.compile(r"[\W_]+")
+_DIGITS   = re.compile(r"\d+")
+
+# {site_key: counters}
+STATS: dict[str, dict] = {}
+
+
+def _stat(site_key: str) -> dict:
+    return STATS.setdefault(site_key, {"checked": 0, "near_dup": 0, "candidates": 0, "loads_avoided": 0, "merged": 0})
+
+
+def normalize_title(title: str) -> str:
+    text = _BRACKETS.sub(" ", (title or "").casefold())
+    text = text.replace("&", " and ")
+    text = _NON_WORD.sub(" ", text)
+    text = _PROMO.sub(" ", text)
+    return " ".join(text.split())
+
+
+def _h64(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), "big")
+
+
+def minhash(norm: str) -> list:
+    padded   = f" {norm} "
+    shingles = {padded[i:i + SHINGLE] for i in range(max(1, len(padded) - SHINGLE + 1))}
+    hashes   = [_h64(s) for s in shingles]
+    return [min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMS]
+
+
+def bands(signature: list) -> list:
+    return [
+        f"{i}:{hashlib.blake2b(repr(signature[i * ROWS:(i + 1) * ROWS]).encode(), digest_size=6).hexdigest()}"
+        for i in range(BANDS)
+    ]
+
+
+def similarity(sig_a: list, sig_b: list) -> float:
+    return sum(a == b for a, b in zip(sig_a, sig_b)) / NUM_PERM
+
+
+def _numbers(norm: str) -> tuple:
+    """"Part 1" و "Part 2" مش نفس الكورس مهما العنوان اتشابه"""
+    return tuple(_DIGITS.findall(norm))
+
+
+def comparable(norm: str) -> bool:
+    """عنوان فاضي / قصير جداً بعد الـ normalize → مش بنعتبره بصمة (كل العناوين دي كانت هتبقى مكررة)"""
+    return len(norm.replace(" ", "")) >= MIN_NORM_CHARS
+
+
+def fields(title: str) -> dict:
+    """الحقول اللي بتتحفظ مع الكورس في Mongo"""
+    norm = normalize_title(title)
+    sig  = minhash(norm)
+    return {
+        "titleKey": hashlib.sha1(norm.encode()).hexdigest()[:20],
+        "minhash":  sig,
+        "lshBands": bands(sig),
+        "nearDupV": FINGERPRINT_VERSION,
+    }
+
+
+class NearDupIndex:
+    """LSH index في الذاكرة - المواقع اللي شغالة مع بعض بتشوف عناوين بعض قبل ما تتحفظ"""
+
+    def __init__(self, capacity: int = NEAR_DUP_MEMORY):
+        self.capacity = capacity
+        self._items   = OrderedDict()   # slug → (titleKey, signature, numbers, bands)
+        self._keys    = {}              # titleKey → slug
+        self._buckets = {}              # band → {slug}
+
+    def __len__(self):
+        return len(self._items)
+
+    def add(self, slug: str, f: dict, numbers: tuple):
+        if slug in self._items:
+            self._items.move_to_end(slug)
+            return
+        self._items[slug] = (f["titleKey"], f["minhash"], numbers, f["lshBands"])
+        self._keys[f["titleKey"]] = slug
+        for band in f["lshBands"]:
+            self._buckets.setdefault(band, set()).add(slug)
+        while len(self._items) > self.capacity:
+            self.forget(next(iter(self._items)))
+
+    def forget(self, slug: str):
+        item = self._items.pop(slug, None)
+        if not item:
+            return
+        key, _, _, item_bands = item
+        if self._keys.get(key) == slug:
+            del self._keys[key]
+        for band in item_bands:
+            bucket = self._buckets.get(band)
+            if bucket:
+                bucket.discard(slug)
+                if not bucket:
+                    del self._buckets[band]
+
+    def query(self, f: dict) -> str | None:
+        """نفس الـ titleKey بالظبط"""
+        return self._keys.get(f["titleKey"])
+
+    def similar(self, f: dict, numbers: tuple) -> str | None:
+        """تشابه تقريبي (LSH + MinHash) - مرشح بس، مش دليل إنه نفس الكورس"""
+        candidates = set()
+        for band in f["lshBands"]:
+            candidates |= self._buckets.get(band, set())
+        for slug in candidates:
+            _, sig, nums, _ = self._items[slug]
+            if nums == numbers and similarity(sig, f["minhash"]) >= NEAR_DUP_THRESHOLD:
+                return slug
+        return None
+
+
+# index واحد للـ process - كل المواقع اللي شغالة بالتوازي بتشاركه
+index = NearDupIndex()
+_backfilled = False
+
+
+async def backfill(db, batch: int = 500):
+    """الكورسات اللي ملهاش بصمة (أو بصمة من normalize أقدم) - مرة واحدة لكل process"""
+    global _backfilled
+    if _backfilled:
+        return
+    _backfilled = True
+    ops, total = [], 0
+    async for doc in db["courses"].find({"nearDupV": {"$ne": FINGERPRINT_VERSION}}, {"title": 1}):
+        ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": fields(doc.get("title", ""))}))
+        if len(ops) >= batch:
+            await db["courses"].bulk_write(ops, ordered=False)
+            total += len(ops)
+            ops = []
+    if ops:
+        await db["courses"].bulk_write(ops, ordered=False)
+        total += len(ops)
+    if total:
+        log.info(f"🧬 near-dup: اتحسب fingerprint لـ {total} كورس قديم")
+
+
+async def split(db, site_key: str, courses: list, resolving: bool = True):
+    """
+    بيرجع (unique, duplicates)
+    - unique: اتضافوا للـ index في الذاكرة (claim) - release() لو الـ resolve فشل أو الموقع خلص
+      (والمشابهين تقريباً لكورس تاني - بيتحلوا ويتأكدوا بالـ courseSlug في الـ writer)
+    - duplicates: نفس الـ titleKey مع كورس محفوظ أو شغال في موقع تاني
+    resolving=True → كل مكرر = browser load اتوفر
+    """
+    if not courses:
+        return [], []
+    await backfill(db)
+    stat = _stat(site_key)
+    prepared, unique = [], []
+    for course in courses:
+        norm = normalize_title(course["title"])
+        if not comparable(norm):
+            # مفيش بصمة كفاية - أحسن من إننا نعتبره مكرر مع كل عنوان قصير تاني
+            unique.append(course)
+            continue
+        prepared.append((course, fields(course["title"]), _numbers(norm)))
+    if not prepared:
+        return unique, []
+
+    # مرشحين من Mongo في query واحدة (titleKey أو أي band مشترك)
+    keys      = list({f["titleKey"] for _, f, _ in prepared})
+    all_bands = list({b for _, f, _ in prepared for b in f["lshBands"]})
+    stored = []
+    async for doc in db["courses"].find(
+        {"$or": [{"titleKey": {"$in": keys}}, {"lshBands": {"$in": all_bands}}]},
+        {"_id": 1, "slug": 1, "title": 1, "titleKey": 1, "minhash": 1},
+    ):
+        stored.append(doc)
+
+    # الكورسات المحفوظة بعنوان قصير / فاضي بعد الـ normalize مش بتتقارن
+    stored = [
+        (doc, _numbers(norm)) for doc in stored
+        if comparable(norm := normalize_title(doc.get("title", "")))
+    ]
+
+    duplicates, merges = [], []
+    for course, f, numbers in prepared:
+        stat["checked"] += 1
+        match = next((doc for doc, _ in stored if doc.get("titleKey") == f["titleKey"]), None)
+        if match:
+            merges.append(UpdateOne({"_id": match["_id"]}, {"$addToSet": {"alsoOn": site_key}}))
+        elif index.query(f) is None:
+            if index.similar(f, numbers) or any(
+                doc.get("minhash") and doc_numbers == numbers
+                and similarity(doc["minhash"], f["minhash"]) >= NEAR_DUP_THRESHOLD
+                for doc, doc_numbers in stored
+            ):
+                stat["candidates"] += 1
+            index.add(course["slug"], f, numbers)
+            unique.append(course)
+            continue
+        stat["near_dup"] += 1
+        if resolving:
+            stat["loads_avoided"] += 1
+        duplicates.append(course)
+
+    if merges:
+        try:
+            await db["courses"].bulk_write(merges, ordered=False)
+            stat["merged"] += len(merges)
+        except Exception as e:
+            log.debug(f"🧬 near-dup merge: {e}")
+    return unique, duplicates
+
+
+def release(slug: str):
+    """الـ resolve فشل → النسخة اللي جاية من موقع تاني تاخد فرصتها"""
+    index.forget(slug)
+
+
+def get_stats() -> dict:
+    return {"indexed": len(index), "sites": {site: dict(c) for site, c in STATS.items()}}
@@ -0,0 +1,113 @@
+"""
+Page Pool
+✅ بدل new_page() / close() لكل URL
+✅ checkout / return مع reset بين كل استخدام (handlers + about:blank)
+✅ الصفحة بتتقفل وتتعمل من جديد بعد PAGE_MAX_USES استخدام
+"""
+
+import asyncio
+import os
+import logging
+from contextlib import asynccontextmanager
+
+log = logging.getLogger("RILLZO")
+
+# أقصى عدد صفحات مفتوحة في الـ pool الواحد
+PAGE_POOL_SIZE = int(os.getenv("PAGE_POOL_SIZE", 6))
+# بعد كام استخدام الصفحة تتقفل وتتعمل من جديد (تسريب ذاكرة / state قديمة)
+PAGE_MAX_USES  = int(os.getenv("PAGE_MAX_USES", 20))
+
+
+class PagePool:
+    """
+    Pool من الصفحات فوق Browser أو BrowserContext
+
+    الاستخدام:
+        async with pool.page() as page:
+            await page.goto(url)
+    """
+
+    def __init__(self, target, size: int = PAGE_POOL_SIZE, max_uses: int = PAGE_MAX_USES, setup=None):
+        """setup(page): coroutine بتتنده على كل صفحة جديدة وبعد كل reset (routes مثلاً)"""
+        self.target    = target
+        self.setup     = setup
+        self.max_uses  = max(1, max_uses)
+        self._sem      = asyncio.Semaphore(max(1, size))
+        self._idle     = []
+        self._uses     = {}
+        self._handlers = {}
+        self.created   = 0
+        self.recycled  = 0
+
+    def listen(self, page, event: str, handler):
+        """page.on() بس الـ pool بيشيل الـ handler تلقائياً عند الـ return"""
+        page.on(event, handler)
+        self._handlers.setdefault(page, []).append((event, handler))
+
+    async def _new_page(self):
+        page = await self.target.new_page()
+        self._uses[page] = 0
+        self.created += 1
+        if self.setup:
+            await self.setup(page)
+        return page
+
+    async def _discard(self, page):
+        self._uses.pop(page, None)
+        self._handlers.pop(page, None)
+        try: await page.close()
+        except: pass
+
+    async def _reset(self, page):
+        for event, handler in self._handlers.pop(page, []):
+            try: page.remove_listener(event, handler)
+            except: pass
+        await page.unroute_all(behavior="ignoreErrors")
+        await page.goto("about:blank")
+        if self.setup:
+            await self.setup(page)
+
+    async def checkout(self):
+        await self._sem.acquire()
+        try:
+            if self._idle:
+                page = self._idle.pop()
+            else:
+                page = await self._new_page()
+        except Exception:
+            self._sem.release()
+            raise
+        self._uses[page] += 1
+        return page
+
+    async def checkin(self, page):
+        try:
+            if page.is_closed():
+                self._uses.pop(page, None)
+                self._handlers.pop(page, None)
+                return
+            if self._uses.get(page, 0) >= self.max_uses:
+                self.recycled += 1
+                await self._discard(page)
+                return
+            try:
+                await self._reset(page)
+            except Exception as e:
+                log.debug(f"♻️ فشل reset للصفحة: {e}")
+                await self._discard(page)
+                return
+            self._idle.append(page)
+        finally:
+            self._sem.release()
+
+    @asynccontextmanager
+    async def page(self):
+        page = await self.checkout()
+        try:
+            yield page
+        finally:
+            await self.checkin(page)
+
+    async def close(self):
+        while self._idle:
+            await self._discard(self._idle.pop())
@@ -0,0 +1,75 @@
+"""
+Scrape Pipeline Metrics
+✅ Queues محدودة بين المراحل (listing → dedup → resolve → classify → persist) = backpressure
+✅ لكل مرحلة: عدد العناصر + وقت الشغل + throughput + أقصى/حالي عمق للـ queue
+"""
+
+import asyncio
+import os
+import time
+from contextlib import contextmanager
+
+# أقصى عدد عناصر مستنية في الـ queue بين أي مرحلتين
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", 50))
+
+STAGES = ("listing", "dedup", "resolve", "classify", "persist")
+
+# علامة نهاية الـ stream
+DONE = object()
+
+# آخر metrics لكل موقع (الشغال دلوقتي أو آخر تشغيلة) - للـ admin
+LAST: dict[str, "PipelineMetrics"] = {}
+
+
+class PipelineMetrics:
+    def __init__(self, site_key: str):
+        self.site_key = site_key
+        self.started  = time.monotonic()
+        self.ended    = None
+        self.queues   = {}
+        self.stats    = {name: {"items": 0, "busy": 0.0, "max_depth": 0} for name in STAGES}
+        LAST[site_key] = self
+
+    def queue(self, stage: str, maxsize: int = PIPELINE_QUEUE_SIZE) -> asyncio.Queue:
+        """الـ queue اللي المرحلة دي بتقرا منه"""
+        self.queues[stage] = asyncio.Queue(maxsize=maxsize)
+        return self.queues[stage]
+
+    async def put(self, stage: str, item):
+        """بيستنى لو الـ queue مليان (backpressure) وبيسجل العمق"""
+        q = self.queues[stage]
+        await q.put(item)
+        stat = self.stats[stage]
+        stat["max_depth"] = max(stat["max_depth"], q.qsize())
+
+    @contextmanager
+    def work(self, stage: str, items: int = 1):
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.stats[stage]["busy"]  += time.monotonic() - started
+            self.stats[stage]["items"] += items
+
+    def finish(self):
+        self.ended = time.monotonic()
+
+    def to_doc(self) -> dict:
+        wall = (self.ended or time.monotonic()) - self.started
+        return {
+            name: {
+                "items":          stat["items"],
+                "busyMs":         round(stat["busy"] * 1000, 1),
+                "perSecond":      round(stat["items"] / wall, 2) if wall > 0 else 0,
+                "maxQueueDepth":  stat["max_depth"],
+                "queueDepth":     self.queues[name].qsize() if name in self.queues else 0,
+            }
+            for name, stat in self.stats.items()
+        }
+
+
+def get_stats() -> dict:
+    return {
+        site_key: {"running": m.ended is None, "stages": m.to_doc()}
+        for site_key, m in LAST.items()
+    }
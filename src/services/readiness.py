@@ -0,0 +1,53 @@
+"""
+Page Readiness
+✅ بدل الـ sleep الثابت بعد كل goto: بنستنى الـ selectors اللي هنستخرج منها أو JS predicate
+✅ بنسجل زمن الجاهزية لكل موقع عشان نظبط الـ timeouts
+"""
+
+import os
+from collections import deque
+
+from src.services.utils import percentile
+
+# أقصى وقت نستنى فيه الجاهزية قبل الـ sleep الاحتياطي
+READY_TIMEOUT_MS = int(os.getenv("READY_TIMEOUT_MS", 15_000))
+# صفحات التفاصيل: زرار الكوبون في الـ HTML من الأول - لو ما ظهرش بعد كده غالباً مش هيظهر
+DETAIL_READY_TIMEOUT_MS = int(os.getenv("DETAIL_READY_TIMEOUT_MS", 6_000))
+
+_SAMPLES: dict[str, deque] = {}
+_TIMEOUTS: dict[str, int] = {}
+
+
+async def wait_ready(page, ready: str, timeout: int = READY_TIMEOUT_MS):
+    """
+    ready: CSS selector أو JS predicate بيبدأ بـ "() =>"
+    بيرمي exception لو عدى الـ timeout
+    """
+    if ready.lstrip().startswith("()"):
+        await page.wait_for_function(ready, timeout=timeout)
+    else:
+        await page.wait_for_selector(ready, state="attached", timeout=timeout)
+
+
+def record(site_key: str | None, seconds: float, ok: bool):
+    if not site_key:
+        return
+    _SAMPLES.setdefault(site_key, deque(maxlen=200)).append(seconds * 1000)
+    if not ok:
+        _TIMEOUTS[site_key] = _TIMEOUTS.get(site_key, 0) + 1
+
+
+def get_stats() -> dict:
+    """زمن الجاهزية بالـ ms (من أول الـ goto) لكل موقع"""
+    stats = {}
+    for site_key, samples in _SAMPLES.items():
+        values = list(samples)
+        stats[site_key] = {
+            "samples":  len(values),
+            "timeouts": _TIMEOUTS.get(site_key, 0),
+            "p50_ms":   percentile(values, 50),
+            "p95_ms":   percentile(values, 95),
+            "max_ms":   round(max(values), 1),
+        }
+    return stats
+
@@ -0,0 +1,237 @@
+"""
+Real.Discount API Capture
+✅ الموقع SPA (MUI) - الكروت بتترسم من JSON بيجي من الـ API بتاعهم
+✅ بنسمع الـ responses بتاعة الصفحة (xhr / fetch + JSON) ونقرا الـ offers منها على طول بدل الـ DOM selectors
+✅ أول ما نعرف الـ endpoint (وفيه param للصفحة) → الصفحات الجاية بـ HTTP عادي من غير render
+✅ لو الـ payload فيه لينك udemy → بيمشي مع الكورس (udemyLink) والـ pipeline بيتخطى صفحة التفاصيل
+✅ أي حاجة مش متوقعة في الـ payload أو الـ HTTP → None والـ scraper بيرجع للـ browser / الـ DOM
+"""
+
+import os
+import asyncio
+import logging
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from src.services import http_resolver
+
+log = logging.getLogger("RILLZO")
+
+REAL_DISCOUNT_API   = os.getenv("REAL_DISCOUNT_API", "true") == "true"
+# أقصى وقت نستنى فيه الـ API response بعد الـ navigation قبل ما نرجع للـ DOM
+API_CAPTURE_TIMEOUT = float(os.getenv("API_CAPTURE_TIMEOUT", 15))
+
+BASE = "https://real.discount"
+
+# أسماء الحقول المحتملة (الـ API مش موثق - بنقرا بتسامح)
+TITLE_KEYS  = ("name", "title", "course_name", "courseName")
+LINK_KEYS   = ("url", "udemy_url", "udemyUrl", "coupon_url", "couponUrl", "course_url", "link", "affiliate_url")
+IMAGE_KEYS  = ("image", "img", "thumbnail", "image_url", "imageUrl", "picture")
+# الـ detailLink لازم يبقى نفس اللي الـ DOM بيطلعه (/offer/<slug>) - الـ link_cache والـ seen-state بيتقابلوا عليه
+# id / _id مش slug: /offer/<id> ممكن ما يكونش موجود أصلاً
+SLUG_KEYS   = ("slug", "offer_slug", "offerSlug")
+OFFER_KEYS  = ("offer_url", "offerUrl", "page_url", "pageUrl", "permalink")
+LIST_KEYS   = ("results", "items", "data", "courses", "offers", "docs")
+PAGE_PARAMS = ("page", "p", "pageNumber", "page_number", "pageNo")
+
+# الـ endpoint اللي اتعرف: (url من غير الـ page param, اسم الـ param) - في الذاكرة لكل process
+_endpoint: tuple[str, str] | None = None
+
+# xhr = اتقرت من response الصفحة | http = صفحة كاملة بـ HTTP | dom = رجعنا للـ selectors | inline = فيها لينك udemy
+STATS = {"xhr": 0, "http": 0, "http_failed": 0, "dom": 0, "inline": 0}
+
+
+def _first(item: dict, keys: tuple):
+    for key in keys:
+        value = item.get(key)
+        if isinstance(value, (str, int)) and str(value).strip():
+            return str(value).strip()
+    return None
+
+
+def _offer_list(payload, depth: int = 0) -> list | None:
+    """أول list of dicts فيها عناوين (الـ payload ممكن يكون list أو dict متلفوف)"""
+    if isinstance(payload, list):
+        if any(isinstance(x, dict) and _first(x, TITLE_KEYS) for x in payload):
+            return payload
+        return None
+    if not isinstance(payload, dict) or depth > 3:
+        return None
+    keys = [k for k in LIST_KEYS if k in payload] + [k for k in payload if k not in LIST_KEYS]
+    for key in keys:
+        found = _offer_list(payload[key], depth + 1)
+        if found:
+            return found
+    return None
+
+
+def _udemy(item: dict) -> str | None:
+    for key in LINK_KEYS:
+        value = item.get(key)
+        if isinstance(value, str) and ("udemy.com" in value or "linksynergy" in value):
+            return value.strip()
+    return None
+
+
+def _offer_page(item: dict) -> str | None:
+    """صفحة الـ offer على real.discount من slug أو URL حقيقي في الـ payload"""
+    slug = _first(item, SLUG_KEYS)
+    if slug:
+        return f"{BASE}/offer/{slug.strip('/')}"
+    url = _first(item, OFFER_KEYS)
+    if url and "/offer/" in url:
+        return url if url.startswith("http") else BASE + url
+    return None
+
+
+def parse_offers(payload) -> list:
+    """نفس شكل الكورسات اللي بيرجعها الـ DOM + udemyLink لو موجود"""
+    courses = []
+    for item in _offer_list(payload) or []:
+        if not isinstance(item, dict):
+            continue
+        title  = _first(item, TITLE_KEYS)
+        link   = _udemy(item)
+        detail = _offer_page(item)
+        if not title or not (detail or link):
+            continue
+        image = _first(item, IMAGE_KEYS)
+        course = {
+            "title":      title,
+            "detailLink": detail or link,
+            "image":      image if image and image.startswith("http") else None,
+            "source":     "real_discount",
+        }
+        if link:
+            course["udemyLink"] = link
+        courses.append(course)
+    return courses
+
+
+def _page_param(url: str, page: int) -> str | None:
+    """اسم الـ query param اللي قيمته رقم الصفحة دي"""
+    params = dict(parse_qsl(urlsplit(url).query))
+    return next((k for k in PAGE_PARAMS if params.get(k) == str(page)), None)
+
+
+def _page_url(page: int) -> str:
+    url, param = _endpoint
+    parts  = urlsplit(url)
+    params = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k != param]
+    params.append((param, str(page)))
+    return urlunsplit(parts._replace(query=urlencode(params)))
+
+
+def endpoint() -> str | None:
+    return _endpoint[0] if _endpoint else None
+
+
+def learn(url: str, page: int):
+    global _endpoint
+    param = _page_param(url, page)
+    if not param or (_endpoint and _endpoint[0] == url):
+        return
+    _endpoint = (url, param)
+    log.info(f"🛰️ real.discount: الـ API endpoint اتعرف ({urlsplit(url).path}) - الصفحات الجاية بـ HTTP")
+
+
+def forget():
+    """الـ endpoint بطل يرجع offers → نرجع نتعلمه من الـ browser"""
+    global _endpoint
+    _endpoint = None
+
+
+def count(mode: str, courses: list) -> list:
+    STATS[mode] += 1
+    STATS["inline"] += sum(1 for c in courses if c.get("udemyLink"))
+    return courses
+
+
+class Capture:
+    """
+    الاستخدام:
+        capture = Capture(page_number)
+        pool.listen(page, "response", capture.on_response)
+        ... goto ...
+        courses = await capture.wait(readiness.wait_ready(page, ready))   # None = مفيش API response مفهوم
+    """
+
+    def __init__(self, page: int):
+        self.page     = page
+        self.courses  = None
+        # الـ DOM readiness خلص (الكروت اترسمت) - للـ readiness stats
+        self.rendered = False
+        self._found   = asyncio.Event()
+        self._pending = set()
+
+    def on_response(self, response):
+        try:
+            if response.request.resource_type not in ("xhr", "fetch"):
+                return
+            if "json" not in (response.headers.get("content-type") or ""):
+                return
+        except Exception:
+            return
+        task = asyncio.ensure_future(self._read(response))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _read(self, response):
+        try:
+            courses = parse_offers(await response.json())
+        except Exception:
+            return
+        if courses and self.courses is None:
+            self.courses = courses
+            learn(response.url, self.page)
+            self._found.set()
+
+    async def wait(self, rendered=None, timeout: float = API_CAPTURE_TIMEOUT) -> list | None:
+        """
+        rendered: coroutine الـ DOM readiness - أيهما يخلص الأول
+        (لو الكروت اترسمت يبقى الـ JSON وصل خلاص - بنستنى قرايته بس)
+        """
+        waiters = [asyncio.ensure_future(self._found.wait())]
+        if rendered is not None:
+            waiters.append(asyncio.ensure_future(rendered))
+        try:
+            await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if self.courses is None and self._pending:
+                await asyncio.wait(list(self._pending), timeout=1)
+        finally:
+            tasks = waiters + list(self._pending)
+            for task in tasks:
+                task.cancel()
+            # الـ readiness timeout (أو أي exception) يتقرا هنا - غير كده "Task exception was never retrieved"
+            await asyncio.gather(*tasks, return_exceptions=True)
+        if rendered is not None:
+            done = waiters[1]
+            self.rendered = not done.cancelled() and done.exception() is None
+        return self.courses
+
+
+async def fetch_page(page: int) -> list | None:
+    """صفحة كاملة بـ HTTP من الـ endpoint اللي اتعرف - None = ارجع للـ browser"""
+    if not _endpoint:
+        return None
+    try:
+        response = await http_resolver.get_client().get(
+            _page_url(page),
+            headers={"Accept": "application/json, text/plain, */*", "Referer": f"{BASE}/"},
+        )
+        if response.status_code == 200:
+            courses = parse_offers(response.json())
+            if courses:
+                return count("http", courses)
+        elif response.status_code == 404 and page > 1:
+            # صفحة بعد الآخر - مش فشل في الـ endpoint
+            # (404 على أول صفحة معناه إن الـ endpoint نفسه اتشال → forget تحت)
+            return count("http", [])
+    except Exception as e:
+        log.debug(f"🛰️ real.discount HTTP page {page}: {e}")
+    STATS["http_failed"] += 1
+    forget()
+    return None
+
+
+def get_stats() -> dict:
+    return dict(STATS, endpoint=endpoint())
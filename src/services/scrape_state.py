@@ -0,0 +1,82 @@
+"""
+Scrape State (High-Water Marks)
+✅ لكل موقع: آخر الـ detail links اللي اتشافت + hash لكل صفحة listing
+✅ التشغيل العادي بيقف أول ما يوصل لصفحة كلها معروفة
+✅ Deep crawl كل DEEP_CRAWL_HOURS بيلف على كل الصفحات
+✅ ETag / Last-Modified بتوع صفحات الـ feed (مواقع WordPress) - بيتحفظوا بس لو التشغيلة خلصت
+"""
+
+import hashlib
+import os
+from datetime import datetime, timezone, timedelta
+
+from src.services.utils import aware
+
+# عدد الـ links اللي بنفتكرها لكل موقع
+SEEN_LINKS_LIMIT = int(os.getenv("SEEN_LINKS_LIMIT", 500))
+# كل كام ساعة نعمل crawl كامل لكل الصفحات
+DEEP_CRAWL_HOURS = float(os.getenv("DEEP_CRAWL_HOURS", 6))
+
+COLLECTION = "scrape_state"
+
+
+def page_hash(courses: list) -> str:
+    links = sorted(c.get("detailLink") or "" for c in courses)
+    return hashlib.sha1("\n".join(links).encode()).hexdigest()
+
+
+class SiteState:
+    def __init__(self, site_key: str, doc: dict | None = None):
+        doc = doc or {}
+        self.site_key    = site_key
+        self.seen_links  = list(doc.get("seenLinks", []))
+        self.page_hashes = dict(doc.get("pageHashes", {}))
+        self.last_deep   = doc.get("lastDeepCrawl")
+        self.feed_validators = dict(doc.get("feedValidators", {}))
+        self._seen       = set(self.seen_links)
+        self._new_links  = []
+
+    def deep_due(self) -> bool:
+        if not self.last_deep:
+            return True
+        return datetime.now(timezone.utc) - aware(self.last_deep) >= timedelta(hours=DEEP_CRAWL_HOURS)
+
+    def page_known(self, page_no: int, courses: list) -> bool:
+        """
+        True لو الصفحة دي مفيهاش أي جديد:
+        نفس الـ hash بتاع المرة اللي فاتت أو كل الـ links اتشافت قبل كده
+        """
+        if not courses:
+            return False
+        key  = str(page_no)
+        same = self.page_hashes.get(key) == page_hash(courses)
+        self.page_hashes[key] = page_hash(courses)
+        return same or all(c.get("detailLink") in self._seen for c in courses)
+
+    def remember(self, courses: list):
+        for c in courses:
+            link = c.get("detailLink")
+            if link and link not in self._seen:
+                self._seen.add(link)
+                self._new_links.append(link)
+
+    def to_doc(self) -> dict:
+        # الأحدث الأول - وبنقص القديم بعد SEEN_LINKS_LIMIT
+        links = (self._new_links + self.seen_links)[:SEEN_LINKS_LIMIT]
+        return {"seenLinks": links, "pageHashes": self.page_hashes, "feedValidators": self.feed_validators}
+
+
+async def load_site_state(db, site_key: str) -> SiteState:
+    doc = await db[COLLECTION].find_one({"_id": site_key})
+    return SiteState(site_key, doc)
+
+
+async def save_site_state(db, state: SiteState, deep: bool):
+    update = {**state.to_doc(), "updatedAt": datetime.now(timezone.utc)}
+    if deep:
+        update["lastDeepCrawl"] = datetime.now(timezone.utc)
+    await db[COLLECTION].update_one(
+        {"_id": state.site_key},
+        {"$set": update},
+        upsert=True
+    )
@@ -5,21 +5,43 @@ RILLZO Scraper Service
    2. Real.Discount  - real.discount
    3. OnlineCourses  - onlinecourses.ooo
    4. Coursevania    - coursevania.com
+
+⚙️ السرعة: صفحات الـ listing والتفاصيل لكل موقع بتعدي من الـ host limiter (نفس الدومين)
+   → الـ cap الفعلي = min(RESOLVE_CONCURRENCY, HOST_MAX_INFLIGHT, HOST_RPS × زمن الصفحة)
+   لو عايز resolve أسرع ارفع HOST_MAX_INFLIGHT و HOST_RPS مع RESOLVE_CONCURRENCY - مش لوحده
 """
 
 import asyncio
 import os
+import time
 import logging
 from datetime import datetime, timezone
 from urllib.parse import urlparse
 
 from slugify import slugify
+from src.services import checkpoint, circuit_breaker, http_resolver, interception, link_cache, near_dup, pipeline, readiness, real_discount_api, site_schedule, site_sessions, telemetry, udemy_link, wp_feed
+from src.services.browser_manager import browser_manager
 from src.services.categories import get_smart_category
+from src.services.course_writer import CourseWriter
+from src.services.page_pool import PagePool
+from src.services.scrape_state import load_site_state, save_site_state
+from src.services.throttle import HostLimiter
 
 log = logging.getLogger("RILLZO")
 
-DELAY_SECONDS   = float(os.getenv("DELAY_SECONDS", 1.5))
-PLACEHOLDER_IMG = "https://via.placeholder.com/300x150?text=Premium+Course"
+# عدد الـ workers اللي بتفتح صفحات التفاصيل في نفس الوقت (لكل موقع)
+RESOLVE_CONCURRENCY = int(os.getenv("RESOLVE_CONCURRENCY", 4))
+# Politeness لكل دومين: طلبات في الثانية + أقصى صفحات مفتوحة
+# ده الـ cap الحقيقي للـ resolve - HOST_MAX_INFLIGHT أقل من RESOLVE_CONCURRENCY = workers مستنية على الفاضي
+HOST_RPS            = float(os.getenv("HOST_RPS", 2))
+HOST_MAX_INFLIGHT   = int(os.getenv("HOST_MAX_INFLIGHT", RESOLVE_CONCURRENCY))
+# عدد صفحات الـ listing المفتوحة في نفس الوقت لكل موقع
+LISTING_CONCURRENCY = int(os.getenv("LISTING_CONCURRENCY", 3))
+# أقصى وقت لتشغيلة كاملة - بعده كل الشغل اللي لسه ماشي بيتلغي بنظافة
+SCRAPE_DEADLINE_MINUTES = float(os.getenv("SCRAPE_DEADLINE_MINUTES", 20))
+# كل المواقع بالتوازي (في الحالتين كل موقع في browser context لوحده)
+SCRAPE_PARALLEL     = os.getenv("SCRAPE_PARALLEL", "true") == "true"
+PLACEHOLDER_IMG     = "https://via.placeholder.com/300x150?text=Premium+Course"
 
 
 def fix_image_url(url, base_url=""):
@@ -31,334 +53,369 @@ def fix_image_url(url, base_url=""):
     return url.split("?")[0]
 
 
-async def create_browser():
-    try:
-        from camoufox.async_api import AsyncCamoufox
-        ctx = AsyncCamoufox(
-            headless=True,
-            os=["windows", "macos", "linux"],
-            block_images=True,
-            i_know_what_im_doing=True,
-            block_webrtc=True,
-            geoip=False,
-        )
-        return ctx, "camoufox"
-    except ImportError:
-        return None, "playwright"
-
-
-async def safe_goto(page, url, timeout=90_000, wait_extra=2):
+host_limiter = HostLimiter(HOST_RPS, HOST_MAX_INFLIGHT)
+
+
+async def safe_goto(page, url, timeout=90_000, wait_extra=2, ready=None, site=None,
+                    ready_timeout=readiness.READY_TIMEOUT_MS):
+    """
+    ready: selector أو JS predicate - أول ما يتحقق نكمل على طول
+    الـ sleep الثابت (wait_extra) بقى fallback بس لو مفيش ready
+    لو الـ ready عدى ready_timeout بنكمل للـ extraction على طول (استنينا كفاية خلاص)
+    """
+    started = time.monotonic()
     try:
         await page.goto(url, wait_until="domcontentloaded", timeout=timeout)
-        await asyncio.sleep(wait_extra)
-        return True
     except Exception:
         try:
             await page.goto(url, wait_until="commit", timeout=30_000)
-            await asyncio.sleep(wait_extra + 2)
-            return True
+            wait_extra += 2
         except Exception as e:
             log.warning(f"⚠️ فشل تحميل {url}: {e}")
             return False
+    if ready:
+        try:
+            await readiness.wait_ready(page, ready, ready_timeout)
+            readiness.record(site, time.monotonic() - started, ok=True)
+        except Exception:
+            readiness.record(site, time.monotonic() - started, ok=False)
+        telemetry.record_nav(time.monotonic() - started)
+        return True
+    await asyncio.sleep(wait_extra)
+    telemetry.record_nav(time.monotonic() - started)
+    return True
 
 
-# ══════════════════════════════════════════════
-# 🕷️ 1: CouponScorpion ✅
-# ══════════════════════════════════════════════
-async def scrape_coupon_scorpion_site(browser, pages=6):
-    base = "https://couponscorpion.com"
+async def _http_page(fetch, *args):
+    """صفحة listing من غير browser - None = ارجع للـ browser (الـ nav بيتسجل للـ telemetry)"""
+    started = time.monotonic()
+    courses = await fetch(*args)
+    if courses is not None:
+        telemetry.record_nav(time.monotonic() - started, via="http")
+    return courses
+
+
+async def _scrape_pages(name, base, pool, pages, scrape_page, stop_when=None, on_page=None):
+    """
+    بيجيب صفحات الـ listing بالتوازي (LISTING_CONCURRENCY)
+    الترتيب بيفضل زي ترتيب الصفحات
+
+    scrape_page(pool, i): list (ممكن فاضية) = الصفحة اتحملت - None = فشل التحميل (الـ breaker)
+
+    stop_when(i, courses): لو اتبعت الصفحات بتتجاب واحدة واحدة
+    وبنقف أول ما يرجع True (صفحة كلها معروفة)
+    on_page(courses): coroutine بتاخد كل صفحة أول ما تتقرا (الـ pipeline)
+    """
+    sem = asyncio.Semaphore(LISTING_CONCURRENCY)
+
+    recorder = telemetry.current_site()
+    breaker  = circuit_breaker.current()
+    cp       = checkpoint.current()
+
+    async def _one(i):
+        async with sem:
+            if (breaker and breaker.tripped) or checkpoint.draining():
+                return []
+            if cp and i in cp.skip_pages:
+                log.info(f"[{name}] ♻️ صفحة {i} خلصت في التشغيلة اللي اتقطعت")
+                return []
+            log.info(f"[{name}] 📡 صفحة {i}...")
+            timing  = telemetry.begin_page()
+            started = None
+            try:
+                async with host_limiter.slot(base):
+                    if checkpoint.draining():
+                        return []
+                    started = time.monotonic()
+                    courses = await scrape_page(pool, i)
+                seen_at = time.monotonic()
+                # الـ page function بترجع None لو التحميل فشل (أي مصدر: browser / feed / API)
+                loaded  = courses is not None
+                courses = courses or []
+                for course in courses:
+                    course["_seenAt"] = seen_at
+                    course["_page"]   = i
+                if breaker:
+                    breaker.record(loaded, None if loaded else f"page {i}: فشل التحميل")
+                if recorder:
+                    recorder.page(i, seen_at - started, timing.get("nav"), len(courses), ok=loaded, via=timing.get("via"))
+                log.info(f"[{name}] ✅ صفحة {i}: {len(courses)} كورس")
+            except Exception as e:
+                if breaker:
+                    breaker.record(False, str(e))
+                if recorder and started:
+                    recorder.page(i, time.monotonic() - started, timing.get("nav"), 0, ok=False)
+                log.warning(f"[{name}] ⚠️ خطأ: {e}")
+                return []
+        # برا الـ semaphore - لو الـ pipeline مليان الـ listing بيستنى (backpressure)
+        if on_page and courses:
+            await on_page(courses)
+        return courses
+
+    if stop_when is None:
+        results = await asyncio.gather(*[_one(i) for i in range(1, pages + 1)])
+        return [c for courses in results for c in courses]
+
     all_courses = []
     for i in range(1, pages + 1):
-        url = base if i == 1 else f"{base}/page/{i}/"
-        log.info(f"[Scorpion] 📡 صفحة {i}...")
-        page = None
-        try:
-            page = await browser.new_page()
-            if not await safe_goto(page, url):
-                continue
-            courses = await page.evaluate("""
-                () => Array.from(document.querySelectorAll('article')).map(el => {
-                    const img = el.querySelector('img');
-                    return {
-                        title:      el.querySelector('h3, h2')?.innerText?.trim() || null,
-                        detailLink: el.querySelector('a')?.href || null,
-                        image:      img?.dataset?.src || img?.dataset?.lazySrc || img?.src || null,
-                        source:     'couponscorpion'
-                    };
-                }).filter(c => c.title && c.detailLink)
-            """)
-            log.info(f"[Scorpion] ✅ صفحة {i}: {len(courses)} كورس")
-            all_courses.extend(courses)
-            await asyncio.sleep(2)
-        except Exception as e:
-            log.warning(f"[Scorpion] ⚠️ خطأ: {e}")
-        finally:
-            if page:
-                try: await page.close()
-                except: pass
+        courses = await _one(i)
+        all_courses.extend(courses)
+        if (breaker and breaker.tripped) or checkpoint.draining():
+            break
+        if stop_when(i, courses):
+            log.info(f"[{name}] ⏹️ صفحة {i} كلها معروفة - وقفنا")
+            break
     return all_courses
 
-async def get_scorpion_direct_link(browser, detail_link):
-    page = None
-    try:
-        page = await browser.new_page()
-        if not await safe_goto(page, detail_link, 45_000):
+
+# ══════════════════════════════════════════════
+# 🕷️ 1: CouponScorpion ✅
+# ══════════════════════════════════════════════
+async def _scrape_coupon_scorpion_page(pool, i):
+    base = "https://couponscorpion.com"
+    url = base if i == 1 else f"{base}/page/{i}/"
+    courses = await _http_page(wp_feed.fetch_page, "couponscorpion", i)
+    if courses is not None:
+        return courses
+    async with pool.page() as page:
+        if not await safe_goto(page, url, ready="article h2, article h3", site="couponscorpion"):
             return None
         return await page.evaluate("""
-            () => {
-                const btn = document.querySelector('a.btn_offer_block.re_track_btn');
-                if (btn?.href) return btn.href;
-                return document.querySelector('a[href*="udemy.com"]')?.href || null;
-            }
+            () => Array.from(document.querySelectorAll('article')).map(el => {
+                const img = el.querySelector('img');
+                return {
+                    title:      el.querySelector('h3, h2')?.innerText?.trim() || null,
+                    detailLink: el.querySelector('a')?.href || null,
+                    image:      img?.dataset?.src || img?.dataset?.lazySrc || img?.src || null,
+                    source:     'couponscorpion'
+                };
+            }).filter(c => c.title && c.detailLink)
         """)
+
+async def scrape_coupon_scorpion_site(pool, pages=6, stop_when=None, on_page=None):
+    return await _scrape_pages("Scorpion", "https://couponscorpion.com", pool, pages, _scrape_coupon_scorpion_page, stop_when, on_page)
+
+async def get_scorpion_direct_link(pool, detail_link):
+    try:
+        async with pool.page() as page:
+            if not await safe_goto(page, detail_link, 45_000,
+                                   ready='a.btn_offer_block, a[href*="udemy.com"]', site="couponscorpion",
+                                   ready_timeout=readiness.DETAIL_READY_TIMEOUT_MS):
+                return None
+            return await page.evaluate("""
+                () => {
+                    const btn = document.querySelector('a.btn_offer_block.re_track_btn');
+                    if (btn?.href) return btn.href;
+                    return document.querySelector('a[href*="udemy.com"]')?.href || null;
+                }
+            """)
     except: return None
-    finally:
-        if page:
-            try: await page.close()
-            except: pass
 
 
 # ══════════════════════════════════════════════
 # 🕷️ 2: Real.Discount ✅
 # ══════════════════════════════════════════════
-async def scrape_real_discount_site(browser, pages=3):
+async def _scrape_real_discount_page(pool, i):
     base = "https://real.discount"
-    all_courses = []
-    for i in range(1, pages + 1):
-        url = f"{base}/?page={i}&store=Udemy&freeOnly=1"
-        log.info(f"[Real.Discount] 📡 صفحة {i}...")
-        page = None
-        try:
-            page = await browser.new_page()
-            try:
-                await page.goto(url, wait_until="networkidle", timeout=90_000)
-            except:
-                await page.goto(url, wait_until="domcontentloaded", timeout=60_000)
-            await asyncio.sleep(5)
-            try:
-                await page.wait_for_selector('[class*="MuiCard"], h6, a[href*="/offer/"]', timeout=15_000)
-            except: pass
-            courses = await page.evaluate("""
-                () => {
-                    const results = [];
-                    for (const sel of ['[class*="MuiCard-root"]', 'a[href*="/offer/"]']) {
-                        const els = document.querySelectorAll(sel);
-                        if (els.length > 3) {
-                            Array.from(els).forEach(el => {
-                                if (el.tagName === 'A') {
-                                    const title = el.querySelector('h6, h5, p')?.innerText?.trim();
-                                    if (title && el.href) results.push({
+    url = f"{base}/?page={i}&store=Udemy&freeOnly=1"
+    # الـ API endpoint معروف → الصفحة بـ HTTP من غير render
+    if real_discount_api.REAL_DISCOUNT_API and real_discount_api.endpoint():
+        courses = await _http_page(real_discount_api.fetch_page, i)
+        if courses is not None:
+            return courses
+    async with pool.page() as page:
+        ready = """
+            () => document.querySelectorAll('[class*="MuiCard-root"], a[href*="/offer/"]').length > 3
+        """
+        if real_discount_api.REAL_DISCOUNT_API:
+            # بنقرا الـ offers من الـ JSON اللي الـ SPA بتجيبه بدل ما نستنى الكروت تترسم
+            capture = real_discount_api.Capture(i)
+            pool.listen(page, "response", capture.on_response)
+            started = time.monotonic()
+            if not await safe_goto(page, url, wait_extra=0, site="real_discount"):
+                return None
+            courses = await capture.wait(readiness.wait_ready(page, ready))
+            # زي safe_goto: من أول الـ goto لحد ما الصفحة بقت قابلة للقراية (الـ JSON أو الكروت)
+            readiness.record("real_discount", time.monotonic() - started, ok=bool(courses) or capture.rendered)
+            if courses:
+                return real_discount_api.count("xhr", courses)
+        # SPA: جاهزة لما الكروت تترسم (نفس شرط الـ extraction: أكتر من 3)
+        elif not await safe_goto(page, url, wait_extra=5, site="real_discount", ready=ready):
+            return None
+        courses = await page.evaluate("""
+            () => {
+                const results = [];
+                for (const sel of ['[class*="MuiCard-root"]', 'a[href*="/offer/"]']) {
+                    const els = document.querySelectorAll(sel);
+                    if (els.length > 3) {
+                        Array.from(els).forEach(el => {
+                            if (el.tagName === 'A') {
+                                const title = el.querySelector('h6, h5, p')?.innerText?.trim();
+                                if (title && el.href) results.push({
+                                    title,
+                                    detailLink: el.href.startsWith('http') ? el.href : 'https://real.discount' + el.getAttribute('href'),
+                                    image: el.querySelector('img')?.src || null,
+                                    source: 'real_discount'
+                                });
+                            } else {
+                                const link  = el.querySelector('a[href*="/offer/"]');
+                                const title = el.querySelector('h6, h5')?.innerText?.trim();
+                                if (title && link) {
+                                    const href = link.href || link.getAttribute('href');
+                                    results.push({
                                         title,
-                                        detailLink: el.href.startsWith('http') ? el.href : 'https://real.discount' + el.getAttribute('href'),
+                                        detailLink: href?.startsWith('http') ? href : 'https://real.discount' + href,
                                         image: el.querySelector('img')?.src || null,
                                         source: 'real_discount'
                                     });
-                                } else {
-                                    const link  = el.querySelector('a[href*="/offer/"]');
-                                    const title = el.querySelector('h6, h5')?.innerText?.trim();
-                                    if (title && link) {
-                                        const href = link.href || link.getAttribute('href');
-                                        results.push({
-                                            title,
-                                            detailLink: href?.startsWith('http') ? href : 'https://real.discount' + href,
-                                            image: el.querySelector('img')?.src || null,
-                                            source: 'real_discount'
-                                        });
-                                    }
                                 }
-                            });
-                            if (results.length > 0) break;
-                        }
-                    }
-                    if (results.length === 0) {
-                        document.querySelectorAll('h6').forEach(h6 => {
-                            const card = h6.closest('a') || h6.closest('[class*="Card"]');
-                            if (card) {
-                                const href = card.href || card.querySelector('a')?.href;
-                                if (href && h6.innerText?.trim()) results.push({
-                                    title: h6.innerText.trim(),
-                                    detailLink: href.startsWith('http') ? href : 'https://real.discount' + href,
-                                    image: card.querySelector('img')?.src || null,
-                                    source: 'real_discount'
-                                });
                             }
                         });
+                        if (results.length > 0) break;
                     }
-                    return results.filter(c => c.title && c.detailLink);
                 }
-            """)
-            log.info(f"[Real.Discount] ✅ صفحة {i}: {len(courses)} كورس")
-            all_courses.extend(courses)
-            await asyncio.sleep(2)
-        except Exception as e:
-            log.warning(f"[Real.Discount] ⚠️ خطأ: {e}")
-        finally:
-            if page:
-                try: await page.close()
-                except: pass
-    return all_courses
-
-async def get_real_discount_direct_link(browser, detail_link):
-    page = None
-    try:
-        page = await browser.new_page()
-        try:
-            await page.goto(detail_link, wait_until="networkidle", timeout=45_000)
-        except:
-            await page.goto(detail_link, wait_until="domcontentloaded", timeout=30_000)
-        await asyncio.sleep(4)
-        return await page.evaluate("""
-            () => {
-                for (const s of ['a[href*="udemy.com/course"]','a[href*="click.linksynergy"]','.MuiButton-root[href*="udemy"]','a[target="_blank"][href*="udemy"]']) {
-                    const el = document.querySelector(s);
-                    if (el?.href?.includes('udemy')) return el.href;
+                if (results.length === 0) {
+                    document.querySelectorAll('h6').forEach(h6 => {
+                        const card = h6.closest('a') || h6.closest('[class*="Card"]');
+                        if (card) {
+                            const href = card.href || card.querySelector('a')?.href;
+                            if (href && h6.innerText?.trim()) results.push({
+                                title: h6.innerText.trim(),
+                                detailLink: href.startsWith('http') ? href : 'https://real.discount' + href,
+                                image: card.querySelector('img')?.src || null,
+                                source: 'real_discount'
+                            });
+                        }
+                    });
                 }
-                return Array.from(document.querySelectorAll('a')).find(a => a.href?.includes('udemy.com/course'))?.href || null;
+                return results.filter(c => c.title && c.detailLink);
             }
         """)
+        return real_discount_api.count("dom", courses)
+
+async def scrape_real_discount_site(pool, pages=3, stop_when=None, on_page=None):
+    return await _scrape_pages("Real.Discount", "https://real.discount", pool, pages, _scrape_real_discount_page, stop_when, on_page)
+
+async def get_real_discount_direct_link(pool, detail_link):
+    try:
+        async with pool.page() as page:
+            if not await safe_goto(page, detail_link, 45_000, wait_extra=4, site="real_discount",
+                                   ready='a[href*="udemy.com/course"], a[href*="click.linksynergy"], a[href*="udemy"]',
+                                   ready_timeout=readiness.DETAIL_READY_TIMEOUT_MS):
+                return None
+            return await page.evaluate("""
+                () => {
+                    for (const s of ['a[href*="udemy.com/course"]','a[href*="click.linksynergy"]','.MuiButton-root[href*="udemy"]','a[target="_blank"][href*="udemy"]']) {
+                        const el = document.querySelector(s);
+                        if (el?.href?.includes('udemy')) return el.href;
+                    }
+                    return Array.from(document.querySelectorAll('a')).find(a => a.href?.includes('udemy.com/course'))?.href || null;
+                }
+            """)
     except: return None
-    finally:
-        if page:
-            try: await page.close()
-            except: pass
 
 
 # ══════════════════════════════════════════════
 # 🕷️ 3: OnlineCourses.Ooo ✅
 # ══════════════════════════════════════════════
-async def scrape_onlinecourses_site(browser, pages=5):
+async def _scrape_onlinecourses_page(pool, i):
     base = "https://www.onlinecourses.ooo"
-    all_courses = []
-    for i in range(1, pages + 1):
-        url = base if i == 1 else f"{base}/page/{i}/"
-        log.info(f"[OnlineCourses] 📡 صفحة {i}...")
-        page = None
-        try:
-            page = await browser.new_page()
-            if not await safe_goto(page, url, wait_extra=3):
-                continue
-            courses = await page.evaluate("""
-                () => Array.from(document.querySelectorAll('article.col_item')).map(el => {
-                    const link = el.querySelector('h2 a, h3 a');
-                    const img  = el.querySelector('img[src*="udemycdn"], img[src*="udemy"], img');
-                    return {
-                        title:      link?.innerText?.trim() || null,
-                        detailLink: link?.href || null,
-                        image:      img?.src?.includes('emoji') ? null : (img?.src || null),
-                        source:     'onlinecourses'
-                    };
-                }).filter(c => c.title && c.detailLink)
-            """)
-            log.info(f"[OnlineCourses] ✅ صفحة {i}: {len(courses)} كورس")
-            all_courses.extend(courses)
-            await asyncio.sleep(2)
-        except Exception as e:
-            log.warning(f"[OnlineCourses] ⚠️ خطأ: {e}")
-        finally:
-            if page:
-                try: await page.close()
-                except: pass
-    return all_courses
-
-async def get_onlinecourses_direct_link(browser, detail_link):
-    page = None
-    try:
-        page = await browser.new_page()
-        if not await safe_goto(page, detail_link, 45_000, wait_extra=3):
+    url = base if i == 1 else f"{base}/page/{i}/"
+    courses = await _http_page(wp_feed.fetch_page, "onlinecourses", i)
+    if courses is not None:
+        return courses
+    async with pool.page() as page:
+        if not await safe_goto(page, url, wait_extra=3, ready="article.col_item", site="onlinecourses"):
             return None
         return await page.evaluate("""
-            () => {
-                for (const s of ['a[href*="udemy.com/course"]','.wp-block-button a','a.elementor-button[href*="udemy"]','.elementor-button-wrapper a','a[href*="udemy"]']) {
-                    const el = document.querySelector(s);
-                    if (el?.href?.includes('udemy.com')) return el.href;
-                }
-                return null;
-            }
+            () => Array.from(document.querySelectorAll('article.col_item')).map(el => {
+                const link = el.querySelector('h2 a, h3 a');
+                const img  = el.querySelector('img[src*="udemycdn"], img[src*="udemy"], img');
+                return {
+                    title:      link?.innerText?.trim() || null,
+                    detailLink: link?.href || null,
+                    image:      img?.src?.includes('emoji') ? null : (img?.src || null),
+                    source:     'onlinecourses'
+                };
+            }).filter(c => c.title && c.detailLink)
         """)
+
+async def scrape_onlinecourses_site(pool, pages=5, stop_when=None, on_page=None):
+    return await _scrape_pages("OnlineCourses", "https://www.onlinecourses.ooo", pool, pages, _scrape_onlinecourses_page, stop_when, on_page)
+
+async def get_onlinecourses_direct_link(pool, detail_link):
+    try:
+        async with pool.page() as page:
+            if not await safe_goto(page, detail_link, 45_000, wait_extra=3,
+                                   ready='a[href*="udemy"]', site="onlinecourses",
+                                   ready_timeout=readiness.DETAIL_READY_TIMEOUT_MS):
+                return None
+            return await page.evaluate("""
+                () => {
+                    for (const s of ['a[href*="udemy.com/course"]','.wp-block-button a','a.elementor-button[href*="udemy"]','.elementor-button-wrapper a','a[href*="udemy"]']) {
+                        const el = document.querySelector(s);
+                        if (el?.href?.includes('udemy.com')) return el.href;
+                    }
+                    return null;
+                }
+            """)
     except: return None
-    finally:
-        if page:
-            try: await page.close()
-            except: pass
 
 
 # ══════════════════════════════════════════════
 # 🕷️ 4: Coursevania ✅
 # ══════════════════════════════════════════════
-async def scrape_coursevania_site(browser, pages=4):
+async def _scrape_coursevania_page(pool, i):
     base = "https://coursevania.com"
-    all_courses = []
-    for i in range(1, pages + 1):
-        url = f"{base}/courses/" if i == 1 else f"{base}/courses/page/{i}/"
-        log.info(f"[Coursevania] 📡 صفحة {i}...")
-        page = None
-        try:
-            page = await browser.new_page()
-            try:
-                await page.goto(url, wait_until="networkidle", timeout=90_000)
-            except:
-                await page.goto(url, wait_until="domcontentloaded", timeout=60_000)
-            await asyncio.sleep(5)
-            try:
-                await page.wait_for_selector('article, h2 a, h3 a, [class*="course"]', timeout=15_000)
-            except: pass
-            courses = await page.evaluate("""
-                () => {
-                    const results = [];
-                    const selectors = ['article h2 a','article h3 a','.course-item h2 a','.entry-title a','h2.course-title a','.wp-block-post h2 a'];
-                    for (const sel of selectors) {
-                        const els = document.querySelectorAll(sel);
-                        if (els.length > 1) {
-                            Array.from(els).forEach(a => {
-                                const container = a.closest('article') || a.closest('li') || a.parentElement;
-                                const img = container?.querySelector('img');
-                                if (a.innerText?.trim() && a.href) results.push({
-                                    title: a.innerText.trim(),
-                                    detailLink: a.href,
-                                    image: img?.src || img?.dataset?.src || null,
-                                    source: 'coursevania'
-                                });
+    url = f"{base}/courses/" if i == 1 else f"{base}/courses/page/{i}/"
+    async with pool.page() as page:
+        if not await safe_goto(page, url, wait_extra=5, site="coursevania",
+                               ready="article h2 a, article h3 a, .entry-title a, h2.course-title a"):
+            return None
+        return await page.evaluate("""
+            () => {
+                const results = [];
+                const selectors = ['article h2 a','article h3 a','.course-item h2 a','.entry-title a','h2.course-title a','.wp-block-post h2 a'];
+                for (const sel of selectors) {
+                    const els = document.querySelectorAll(sel);
+                    if (els.length > 1) {
+                        Array.from(els).forEach(a => {
+                            const container = a.closest('article') || a.closest('li') || a.parentElement;
+                            const img = container?.querySelector('img');
+                            if (a.innerText?.trim() && a.href) results.push({
+                                title: a.innerText.trim(),
+                                detailLink: a.href,
+                                image: img?.src || img?.dataset?.src || null,
+                                source: 'coursevania'
                             });
-                            if (results.length > 0) break;
-                        }
+                        });
+                        if (results.length > 0) break;
                     }
-                    return results.filter(c => c.title && c.detailLink);
                 }
-            """)
-            log.info(f"[Coursevania] ✅ صفحة {i}: {len(courses)} كورس")
-            all_courses.extend(courses)
-            await asyncio.sleep(2)
-        except Exception as e:
-            log.warning(f"[Coursevania] ⚠️ خطأ: {e}")
-        finally:
-            if page:
-                try: await page.close()
-                except: pass
-    return all_courses
+                return results.filter(c => c.title && c.detailLink);
+            }
+        """)
+
+async def scrape_coursevania_site(pool, pages=4, stop_when=None, on_page=None):
+    return await _scrape_pages("Coursevania", "https://coursevania.com", pool, pages, _scrape_coursevania_page, stop_when, on_page)
 
-async def get_coursevania_direct_link(browser, detail_link):
-    page = None
+async def get_coursevania_direct_link(pool, detail_link):
     try:
-        page = await browser.new_page()
-        try:
-            await page.goto(detail_link, wait_until="networkidle", timeout=45_000)
-        except:
-            await page.goto(detail_link, wait_until="domcontentloaded", timeout=30_000)
-        await asyncio.sleep(3)
-        return await page.evaluate("""
-            () => {
-                for (const s of ['a[href*="udemy.com/course"]','.coupon-btn a','a.btn[href*="udemy"]','.wp-block-button a','a[href*="udemy"]']) {
-                    const el = document.querySelector(s);
-                    if (el?.href?.includes('udemy.com')) return el.href;
+        async with pool.page() as page:
+            if not await safe_goto(page, detail_link, 45_000, wait_extra=3,
+                                   ready='a[href*="udemy"]', site="coursevania",
+                                   ready_timeout=readiness.DETAIL_READY_TIMEOUT_MS):
+                return None
+            return await page.evaluate("""
+                () => {
+                    for (const s of ['a[href*="udemy.com/course"]','.coupon-btn a','a.btn[href*="udemy"]','.wp-block-button a','a[href*="udemy"]']) {
+                        const el = document.querySelector(s);
+                        if (el?.href?.includes('udemy.com')) return el.href;
+                    }
+                    return null;
                 }
-                return null;
-            }
-        """)
+            """)
     except: return None
-    finally:
-        if page:
-            try: await page.close()
-            except: pass
 
 
 # ══════════════════════════════════════════════
@@ -397,91 +454,441 @@ SITES = {
 
 
 # ══════════════════════════════════════════════
-# 💾 حفظ في MongoDB
+# 🚀 المحرك الرئيسي
 # ══════════════════════════════════════════════
-async def save_course(db, course_doc):
+async def scrape_coupon_scorpion(db, sites=None):
+    """
+    sites=None → المواقع اللي عليها الدور في الـ adaptive schedule بس
+    (الـ scheduler بيصحى كل SCHEDULER_TICK_MINUTES)
+    """
+    if sites is None:
+        sites = await runnable_sites(db)
+        if not sites:
+            log.debug("⏳ مفيش موقع عليه الدور دلوقتي")
+            return {"sites": [], "saved": 0, "skipped": 0}
+    log.info(f"🛡️ جاري تشغيل المحرك... ({', '.join(sites)})")
+    async with browser_manager.session() as browser:
+        run = telemetry.RunRecorder("scrape", engine=browser_manager.engine)
+        await run.start(db)
+        status = "error"
+        try:
+            async with asyncio.timeout(SCRAPE_DEADLINE_MINUTES * 60):
+                await _run_all_sites(db, browser, run, sites)
+            # الـ worker بيقفل (drain) - الباقي في الـ checkpoints
+            status = "interrupted" if checkpoint.draining() else "ok"
+        except TimeoutError:
+            status = "timeout"
+            log.warning(f"⏱️ التشغيلة عدت {SCRAPE_DEADLINE_MINUTES} دقيقة - اتلغت")
+        finally:
+            await run.finish(db, status)
+    return {
+        "sites":   list(sites),
+        "status":  status,
+        "saved":   sum(rec.counts["saved"] for rec in run.sites.values()),
+        "skipped": sum(rec.counts["skipped"] for rec in run.sites.values()),
+    }
+
+
+def enabled_sites() -> list:
+    return [key for key, cfg in SITES.items() if cfg["enabled"]]
+
+
+async def runnable_sites(db) -> list:
+    """
+    المواقع اللي عليها الدور في الـ schedule (أو عندها تشغيلة اتقطعت - checkpoint)
+    والـ circuit بتاعها مش مفتوح
+    """
+    enabled = enabled_sites()
+    due     = set(await site_schedule.due_sites(db, enabled)) | set(await checkpoint.sites(db))
+    due     = [key for key in enabled if key in due]
+    return await circuit_breaker.allowed_sites(db, due) if due else []
+
+
+async def resolve_direct_link(pool, site_key, cfg, detail_link):
+    """
+    HTTP الأول (لو الموقع بيسمح) - والـ browser fallback بس لو فشل
+    اللينك بيرجع canonical (udemy.com/course/<slug>/?couponCode=X) - ده اللي بيتكاش ويتحفظ
+    """
+    link = None
+    if http_resolver.supports(site_key):
+        link = await http_resolver.fetch_direct_link(site_key, detail_link)
+    if not link:
+        link = await cfg["get_link"](pool, detail_link)
+    return await udemy_link.canonical(link)
+
+
+def get_scraper_stats() -> dict:
+    """كل عدادات السكرابر في مكان واحد (للـ admin endpoint)"""
+    return {
+        "http_resolver": http_resolver.get_stats(),
+        "link_cache":    link_cache.get_stats(),
+        "readiness":     readiness.get_stats(),
+        "interception":  interception.get_stats(),
+        "browser":       browser_manager.stats(),
+        "pipeline":      pipeline.get_stats(),
+        "sessions":      site_sessions.get_stats(),
+        "near_dup":      near_dup.get_stats(),
+        "canonical":     udemy_link.get_stats(),
+        "real_discount": real_discount_api.get_stats(),
+        "wp_feed":       wp_feed.get_stats(),
+    }
+
+
+async def _filter_known(db, courses):
+    """
+    Dedup لكل الـ batch في query واحدة ($in على الـ slugs والـ titles)
+    بيرجع (الكورسات الجديدة مع الـ slug, عدد المعروف + المكرر في نفس الـ batch)
+    """
+    candidates = {}
+    valid = 0
+    for course in courses:
+        if not course.get("title") or not course.get("detailLink"):
+            continue
+        valid += 1
+        candidates.setdefault(slugify(course["title"]), course)
+    if not candidates:
+        return [], 0
+
+    slugs  = list(candidates)
+    titles = [c["title"] for c in candidates.values()]
+    known_slugs, known_titles = set(), set()
+    async for doc in db["courses"].find(
+        {"$or": [{"slug": {"$in": slugs}}, {"title": {"$in": titles}}]},
+        {"_id": 0, "slug": 1, "title": 1},
+    ):
+        known_slugs.add(doc.get("slug"))
+        known_titles.add(doc.get("title"))
+
+    pending = [
+        {**course, "slug": slug}
+        for slug, course in candidates.items()
+        if slug not in known_slugs and course["title"] not in known_titles
+    ]
+    return pending, valid - len(pending)
+
+
+async def _run_site(db, browser, site_key, cfg, run=None):
+    """
+    اقتناص موقع واحد كـ pipeline متدفق:
+        listing → dedup → resolve → classify → persist
+    كل مرحلة task لوحدها وبينهم queues محدودة (PIPELINE_QUEUE_SIZE) = backpressure
+    الكورس بيتحفظ بعد ثواني من قراية صفحته بدل ما يستنى الموقع كله
+    """
+    log.info(f"\n{'='*50}\n🌐 {site_key}\n{'='*50}")
+    saved = skipped = 0
+    recorder = (run or telemetry.RunRecorder("scrape")).site(site_key)
+    token = telemetry.use_site(recorder)
+    pool = PagePool(browser, setup=lambda page: interception.install(page, site_key))
+    writer = CourseWriter(db)
+    metrics = pipeline.PipelineMetrics(site_key)
+    pages_q    = metrics.queue("dedup")
+    resolve_q  = metrics.queue("resolve")
+    classify_q = metrics.queue("classify")
+    persist_q  = metrics.queue("persist")
+    seen_at = {}
+    # الـ near-dup claims بتاعة الموقع ده - بتتشال في الآخر (الكورس بقى في Mongo خلاص)
+    claimed = []
+
+    def _count(outcomes):
+        nonlocal saved, skipped
+        for doc, is_new in outcomes:
+            cp.saved(doc["slug"])
+            if is_new:
+                saved += 1
+                if seen_at.get(doc["slug"]):
+                    recorder.fresh(seen_at[doc["slug"]])
+                log.info(f"[{site_key}] ✅ {doc['title'][:50]}")
+            else:
+                skipped += 1
+
+    # ── 1: listing ──
+    async def _listing(state, deep):
+        async def _on_page(courses):
+            metrics.stats["listing"]["items"] += len(courses)
+            await metrics.put("dedup", courses)
+        # half_open: صفحة واحدة بس كـ probe
+        pages = 1 if breaker.probing else cfg["pages"]
+        # الـ deep crawl بيجيب الـ feed كامل (من غير If-None-Match)
+        feed_token = wp_feed.use(state.feed_validators, conditional=not deep)
+        try:
+            raw = await cfg["scraper"](pool, pages, None if deep else state.page_known, _on_page)
+        finally:
+            wp_feed.release(feed_token)
+        log.info(f"[{site_key}] 🔍 مكتشف: {len(raw)}" + (" (deep crawl)" if deep else ""))
+        state.remember(raw)
+        recorder.add("discovered", len(raw))
+        await metrics.put("dedup", pipeline.DONE)
+
+    # ── 2: dedup (DB + link cache) ──
+    async def _dedup():
+        nonlocal skipped
+        slugs = set()
+        # التشغيلة اللي اتقطعت: اللي اتحل يروح للحفظ على طول والباقي للـ resolve
+        pending, ready = cp.resume_items()
+        slugs.update(c["slug"] for c in pending)
+        slugs.update(c["slug"] for c, _ in ready)
+        for item in ready:
+            await metrics.put("classify", item)
+        for course in pending:
+            await metrics.put("resolve", course)
+        while (batch := await pages_q.get()) is not pipeline.DONE:
+            with metrics.work("dedup", len(batch)):
+                pending, known = await _filter_known(db, batch)
+                # نفس الكورس في أكتر من صفحة
+                fresh = [c for c in pending if c["slug"] not in slugs]
+                known += len(pending) - len(fresh)
+                slugs.update(c["slug"] for c in fresh)
+                cached, fresh, negative = await link_cache.split_cached(db, site_key, fresh)
+                # نفس الكورس بعنوان مختلف شوية (محفوظ أو جاي من موقع تاني) - قبل فتح صفحة التفاصيل
+                fresh, near = await near_dup.split(db, site_key, fresh)
+                cached_courses, cached_near = await near_dup.split(db, site_key, [c for c, _ in cached], resolving=False)
+                claimed.extend(c["slug"] for c in fresh + cached_courses)
+                cached = [(c, link) for c, link in cached if c in cached_courses]
+                # الـ listing جاب لينك udemy مع الكورس (real.discount API) → مفيش صفحة تفاصيل
+                inline = [(c, c["udemyLink"]) for c in fresh if c.get("udemyLink")]
+                fresh  = [c for c in fresh if not c.get("udemyLink")]
+                skipped += known + negative + len(near) + len(cached_near)
+                recorder.add("known", known)
+                recorder.add("cached", len(cached))
+                recorder.add("negative", negative)
+                recorder.add("near_dup", len(near) + len(cached_near))
+                recorder.add("inline", len(inline))
+            cp.queued(fresh)
+            cp.page_done(batch[0].get("_page"))
+            for course, link in cached + inline:
+                seen_at[course["slug"]] = course.get("_seenAt")
+                # entries قديمة في الكاش (أو لينك الـ API) ممكن تكون wrapper
+                link = await udemy_link.canonical(link)
+                cp.got_link(course, link)
+                await metrics.put("classify", (course, link))
+            for course in fresh:
+                seen_at[course["slug"]] = course.get("_seenAt")
+                await metrics.put("resolve", course)
+        for _ in range(RESOLVE_CONCURRENCY):
+            await metrics.put("resolve", pipeline.DONE)
+
+    # ── 3: resolve (RESOLVE_CONCURRENCY worker) ──
+    # نتايج الـ resolve اللي لسه ما اتكتبتش في الـ link cache - الـ ticker بيكتبها batch
+    resolved = []
+
+    async def _flush_links():
+        batch = resolved[:]
+        del resolved[:]
+        try:
+            await link_cache.record_results(db, site_key, batch)
+        except Exception as e:
+            log.warning(f"[{site_key}] ⚠️ فشل حفظ الـ link cache: {e}")
+
+    async def _resolve_worker():
+        nonlocal skipped
+        while (course := await resolve_q.get()) is not pipeline.DONE:
+            if checkpoint.draining():
+                # الـ process بيقفل - الكورس يفضل في الـ checkpoint للتشغيلة الجاية
+                continue
+            if breaker.tripped:
+                # الموقع واقع - مش هنستنى timeout على كل صفحة تفاصيل (ولا نكاشها كفشل)
+                near_dup.release(course["slug"])
+                skipped += 1
+                continue
+            with metrics.work("resolve"):
+                async with host_limiter.slot(course["detailLink"]):
+                    # الـ drain ممكن يكون بدأ واحنا مستنيين الـ slot
+                    if checkpoint.draining():
+                        continue
+                    link = await resolve_direct_link(pool, site_key, cfg, course["detailLink"])
+            resolved.append((course["detailLink"], link))
+            recorder.add("resolved" if link else "failed")
+            if not link:
+                near_dup.release(course["slug"])
+                cp.dropped(course["slug"])
+                skipped += 1
+                continue
+            cp.got_link(course, link)
+            await metrics.put("classify", (course, link))
+
+    async def _resolve():
+        await asyncio.gather(*[_resolve_worker() for _ in range(RESOLVE_CONCURRENCY)])
+        await _flush_links()
+        await metrics.put("classify", pipeline.DONE)
+
+    # ── 4: classify ──
+    async def _classify():
+        while (item := await classify_q.get()) is not pipeline.DONE:
+            course, link = item
+            with metrics.work("classify"):
+                smart_cat = await get_smart_category(course["title"], cfg["category"])
+            await metrics.put("persist", {
+                "title":     course["title"],
+                "slug":      course["slug"],
+                "image":     fix_image_url(course.get("image"), course.get("detailLink", "")),
+                "udemyLink": link,
+                "category":  smart_cat,
+                "source":    site_key,
+                "isFree":    True,
+                "addedAt":   datetime.now(timezone.utc),
+                **near_dup.fields(course["title"]),
+                **udemy_link.fields(link),
+            })
+        await metrics.put("persist", pipeline.DONE)
+
+    # ── 5: persist (bulk + flush دوري لو الـ stream هادي) ──
+    async def _persist():
+        async def _ticker():
+            while True:
+                await asyncio.sleep(writer.flush_seconds)
+                _count(await writer.flush())
+                await _flush_links()
+                try:
+                    await checkpoint.save(db, cp)
+                except Exception as e:
+                    log.warning(f"[{site_key}] ⚠️ فشل حفظ الـ checkpoint: {e}")
+
+        ticker = asyncio.create_task(_ticker())
+        try:
+            while (doc := await persist_q.get()) is not pipeline.DONE:
+                with metrics.work("persist"):
+                    _count(await writer.add(doc))
+        finally:
+            ticker.cancel()
+            _count(await writer.flush())
+
+    breaker = circuit_breaker.SiteBreaker(site_key)
+    breaker_token = circuit_breaker.use(breaker)
+    cp = cp_token = None
     try:
-        result = await db["courses"].update_one(
-            {"slug": course_doc["slug"]},
-            {"$setOnInsert": course_doc},
-            upsert=True
-        )
-        return result.upserted_id is not None
+        await circuit_breaker.restore(db, breaker)
+        await udemy_link.backfill(db)
+        if not breaker.allow():
+            raise RuntimeError(f"الـ circuit مفتوح لحد {breaker.retry_at:%H:%M}")
+        state = await load_site_state(db, site_key)
+        cp = await checkpoint.load(db, site_key)
+        cp_token = checkpoint.use(cp)
+        # التشغيلة اللي اتقطعت بتكمل بنفس النوع (deep / عادي) عشان الصفحات اللي خلصت تفضل متخطية صح
+        deep = cp.deep if cp.resumed and cp.deep is not None else state.deep_due()
+        cp.deep = deep
+        # مرحلة تقع → الـ TaskGroup بيلغي الباقي (محدش يفضل مستني على queue)
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(_listing(state, deep))
+            tg.create_task(_dedup())
+            tg.create_task(_resolve())
+            tg.create_task(_classify())
+            tg.create_task(_persist())
+        drained = checkpoint.draining()
+        # الـ deep crawl ما خلصش لو اتقطع في الـ drain
+        await save_site_state(db, state, deep and not drained)
+        log.info(f"[{site_key}] 🏁 محفوظ: {saved} | متخطى: {skipped}" + (" (اتقطع - الباقي في الـ checkpoint)" if drained else ""))
     except Exception as e:
-        if hasattr(e, "code") and e.code == 11000:
-            return False
-        log.error(f"⚠️ خطأ في الحفظ: {e}")
-        return False
+        if isinstance(e, ExceptionGroup):
+            e = e.exceptions[0]
+        recorder.error = str(e)
+        log.error(f"[{site_key}] ❌ خطأ: {e}")
+    except asyncio.CancelledError:
+        # الـ deadline بتاع التشغيلة خلص - التنضيف تحت بيكمل عادي
+        recorder.error = "cancelled (run deadline)"
+        log.warning(f"[{site_key}] ⏱️ اتلغى - الـ deadline خلص")
+        raise
+    finally:
+        metrics.finish()
+        # الـ deadline / الـ drain / خطأ: اللي اتحل لحد دلوقتي ما يضيعش
+        await _flush_links()
+        circuit_breaker.release(breaker_token)
+        if breaker.tripped and recorder.error is None:
+            recorder.error = f"circuit open: {breaker.last_error}"
+        if cp:
+            checkpoint.release(cp_token)
+            try:
+                if recorder.error is None and not checkpoint.draining():
+                    await checkpoint.clear(db, site_key)
+                else:
+                    await checkpoint.save(db, cp, force=True)
+            except Exception as e:
+                log.warning(f"[{site_key}] ⚠️ فشل حفظ الـ checkpoint: {e}")
+        breaker.finish()
+        try:
+            await circuit_breaker.save(db, breaker)
+        except Exception as e:
+            log.warning(f"[{site_key}] ⚠️ فشل حفظ الـ circuit breaker: {e}")
+        for slug in claimed:
+            near_dup.release(slug)
+        await pool.close()
+        browser_manager.record_pages(pool.created)
+        recorder.add("saved", saved)
+        recorder.add("skipped", skipped)
+        recorder.stages = metrics.to_doc()
+        recorder.finish()
+        telemetry.release_site(token)
+        # صفر كورسات جديدة من listing سليم = dry (مش error) - site_schedule بيتعامل معاه بالـ dryStreak
+        errored = recorder.error is not None or recorder.listing_failed()
+        try:
+            await site_schedule.record_run(db, site_key, saved, errored)
+        except Exception as e:
+            log.warning(f"[{site_key}] ⚠️ فشل تحديث الـ schedule: {e}")
+    return saved, skipped
 
 
-# ══════════════════════════════════════════════
-# 🚀 المحرك الرئيسي
-# ══════════════════════════════════════════════
-async def scrape_coupon_scorpion(db):
-    log.info("🛡️ جاري تشغيل المحرك...")
-    ctx, engine = await create_browser()
-    if engine == "camoufox" and ctx:
-        async with ctx as browser:
-            await _run_all_sites(db, browser)
-    else:
-        from playwright.async_api import async_playwright
-        async with async_playwright() as pw:
-            browser = await pw.chromium.launch(
-                headless=True,
-                args=["--no-sandbox", "--disable-setuid-sandbox",
-                      "--disable-dev-shm-usage", "--disable-gpu"]
-            )
-            try:
-                await _run_all_sites(db, browser)
-            finally:
-                await browser.close()
+async def _run_site_isolated(db, browser, site_key, cfg, run=None):
+    """
+    كل موقع في browser context منفصل (cookies/cache مستقلة)
+    الـ context بيبدأ بالـ storage state المحفوظة للموقع (لو موجودة) - وبتتحفظ تاني لو التشغيلة نجحت
+    """
+    run = run or telemetry.RunRecorder("scrape")
+    recorder = run.site(site_key)
+    try:
+        state = await site_sessions.load(db, site_key)
+    except Exception as e:
+        log.warning(f"[{site_key}] ⚠️ فشل تحميل الـ session: {e}")
+        state = None
+    recorder.session = "warm" if state else "cold"
+    context = await browser.new_context(storage_state=state) if state else await browser.new_context()
+    try:
+        result = await _run_site(db, context, site_key, cfg, run)
+        first = next((p for p in recorder.pages if p["page"] == 1 and p["ok"]), None)
+        if first:
+            site_sessions.record_first_page(site_key, bool(state), first["navMs"] + first["extractMs"], first["via"])
+        try:
+            # زي الـ schedule: تشغيلة اتكملت من checkpoint / وقفت على صفحة معروفة مش فشل
+            if recorder.error is None and not recorder.listing_failed():
+                await site_sessions.save(db, site_key, await context.storage_state())
+            elif state:
+                log.info(f"[{site_key}] 🍪 الموقع فشل - مسحنا الـ session المحفوظة")
+                await site_sessions.invalidate(db, site_key)
+        except Exception as e:
+            log.warning(f"[{site_key}] ⚠️ فشل حفظ الـ session: {e}")
+        return result
+    finally:
+        try: await context.close()
+        except: pass
 
 
-async def _run_all_sites(db, browser):
+async def _run_all_sites(db, browser, run=None, sites=None):
+    """sites: المواقع المطلوبة (None = كل المواقع المفعّلة)"""
     total_saved = total_skipped = 0
+    enabled = []
     for site_key, cfg in SITES.items():
         if not cfg["enabled"]:
             log.info(f"⏭️ [{site_key}] معطل")
             continue
-        log.info(f"\n{'='*50}\n🌐 {site_key}\n{'='*50}")
+        if sites is not None and site_key not in sites:
+            continue
+        enabled.append((site_key, cfg))
+
+    if SCRAPE_PARALLEL:
+        # النتايج بتتجمع أول ما كل موقع يخلص - الوقت الكلي = أبطأ موقع
+        tasks = [asyncio.create_task(_run_site_isolated(db, browser, k, cfg, run)) for k, cfg in enabled]
         try:
-            raw = await cfg["scraper"](browser, cfg["pages"])
-            log.info(f"[{site_key}] 🔍 مكتشف: {len(raw)}")
-            saved = skipped = 0
-            for course in raw:
-                if not course.get("title") or not course.get("detailLink"):
-                    continue
-                slug = slugify(course["title"])
-                exists = await db["courses"].find_one({
-                    "$or": [{"slug": slug}, {"title": course["title"]}]
-                })
-                if exists:
-                    skipped += 1
-                    continue
-                link = await cfg["get_link"](browser, course["detailLink"])
-                if not link:
-                    skipped += 1
-                    continue
-                smart_cat = await get_smart_category(course["title"], cfg["category"])
-                is_new = await save_course(db, {
-                    "title":     course["title"],
-                    "slug":      slug,
-                    "image":     fix_image_url(course.get("image"), course.get("detailLink", "")),
-                    "udemyLink": link,
-                    "category":  smart_cat,
-                    "source":    site_key,
-                    "isFree":    True,
-                    "addedAt":   datetime.now(timezone.utc),
-                })
-                if is_new:
-                    saved += 1
-                    log.info(f"[{site_key}] ✅ {course['title'][:50]}")
-                else:
-                    skipped += 1
-                await asyncio.sleep(DELAY_SECONDS)
-            log.info(f"[{site_key}] 🏁 محفوظ: {saved} | متخطى: {skipped}")
+            for fut in asyncio.as_completed(tasks):
+                saved, skipped = await fut
+                total_saved   += saved
+                total_skipped += skipped
+        finally:
+            # إلغاء (deadline) → كل المواقع تتلغي وتستنى التنضيف بتاعها (pool / context / state)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    else:
+        for site_key, cfg in enabled:
+            saved, skipped = await _run_site_isolated(db, browser, site_key, cfg, run)
             total_saved   += saved
             total_skipped += skipped
-        except Exception as e:
-            log.error(f"[{site_key}] ❌ خطأ: {e}")
     log.info(f"\n🎉 انتهى الكل! 💾 محفوظ: {total_saved} | ⏭️ متخطى: {total_skipped}")
+    return total_saved, total_skipped
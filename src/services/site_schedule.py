@@ -0,0 +1,93 @@
+"""
+Adaptive Site Schedule
+✅ كل موقع ليه interval خاص بيه بدل 5 دقائق للكل
+✅ الموقع اللي بيجيب كورسات كتير → بيتشيك أسرع (لحد SITE_MIN_INTERVAL_MIN)
+✅ الموقع الناشف أو اللي بيفشل → backoff أُسّي (لحد SITE_MAX_INTERVAL_MIN)
+✅ الـ interval الحالي وسببه محفوظين في Mongo وظاهرين في الـ admin
+"""
+
+import os
+from datetime import datetime, timezone, timedelta
+
+from src.services.utils import aware
+
+# الـ scheduler job بيصحى كل كام دقيقة يشوف مين عليه الدور
+SCHEDULER_TICK_MINUTES = float(os.getenv("SCHEDULER_TICK_MINUTES", 1))
+SITE_BASE_INTERVAL_MIN = float(os.getenv("SITE_BASE_INTERVAL_MIN", 5))
+SITE_MIN_INTERVAL_MIN  = float(os.getenv("SITE_MIN_INTERVAL_MIN", 3))
+SITE_MAX_INTERVAL_MIN  = float(os.getenv("SITE_MAX_INTERVAL_MIN", 120))
+# عدد الكورسات الجديدة في التشغيلة اللي فوقه نسرّع
+SITE_TARGET_YIELD      = float(os.getenv("SITE_TARGET_YIELD", 5))
+# وزن آخر تشغيلة في المتوسط المتحرك
+EWMA_ALPHA = 0.3
+
+COLLECTION = "site_schedule"
+
+
+def _clamp(minutes: float) -> float:
+    return round(max(SITE_MIN_INTERVAL_MIN, min(SITE_MAX_INTERVAL_MIN, minutes)), 2)
+
+
+def next_interval(doc: dict, new_courses: int, errored: bool) -> dict:
+    """بيحسب الحالة الجديدة للموقع بعد تشغيلة (pure - من غير DB)"""
+    runs       = doc.get("runs", 0) + 1
+    yield_ewma = doc.get("yieldEwma", float(new_courses))
+    error_rate = doc.get("errorRate", 0.0)
+    yield_ewma = EWMA_ALPHA * new_courses + (1 - EWMA_ALPHA) * yield_ewma
+    error_rate = EWMA_ALPHA * (1.0 if errored else 0.0) + (1 - EWMA_ALPHA) * error_rate
+    fail_streak = doc.get("failStreak", 0) + 1 if errored else 0
+    dry_streak  = doc.get("dryStreak", 0) + 1 if (not errored and new_courses == 0) else 0
+
+    if errored:
+        interval = _clamp(SITE_BASE_INTERVAL_MIN * 2 ** fail_streak)
+        reason   = f"backoff: {fail_streak} فشل متتالي"
+    elif dry_streak:
+        interval = _clamp(SITE_BASE_INTERVAL_MIN * 2 ** (dry_streak - 1))
+        reason   = f"dry: {dry_streak} تشغيلة من غير جديد"
+    else:
+        # منتج: كل ما الـ yield يعلى عن الـ target الـ interval يقل
+        interval = _clamp(SITE_BASE_INTERVAL_MIN * min(1.0, SITE_TARGET_YIELD / max(yield_ewma, 1e-9)))
+        reason   = f"productive: yield≈{yield_ewma:.1f}"
+
+    now = datetime.now(timezone.utc)
+    return {
+        "runs":        runs,
+        "yieldEwma":   round(yield_ewma, 3),
+        "errorRate":   round(error_rate, 3),
+        "failStreak":  fail_streak,
+        "dryStreak":   dry_streak,
+        "lastNew":     new_courses,
+        "lastRunAt":   now,
+        "intervalMin": interval,
+        "reason":      reason,
+        "nextRunAt":   now + timedelta(minutes=interval),
+    }
+
+
+async def due_sites(db, site_keys: list) -> list:
+    """المواقع اللي عليها الدور (أو اللي لسه ملهاش schedule)"""
+    now  = datetime.now(timezone.utc)
+    docs = {}
+    async for doc in db[COLLECTION].find({"_id": {"$in": site_keys}}):
+        docs[doc["_id"]] = doc
+    return [
+        key for key in site_keys
+        if key not in docs or not docs[key].get("nextRunAt") or aware(docs[key]["nextRunAt"]) <= now
+    ]
+
+
+async def record_run(db, site_key: str, new_courses: int, errored: bool):
+    doc = await db[COLLECTION].find_one({"_id": site_key}) or {}
+    await db[COLLECTION].update_one(
+        {"_id": site_key},
+        {"$set": next_interval(doc, new_courses, errored)},
+        upsert=True
+    )
+
+
+async def get_schedule(db) -> list:
+    sites = []
+    async for doc in db[COLLECTION].find({}).sort("_id", 1):
+        doc["site"] = doc.pop("_id")
+        sites.append(doc)
+    return sites
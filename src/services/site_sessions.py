@@ -0,0 +1,82 @@
+"""
+Site Sessions (storage state لكل موقع)
+✅ الـ cookies + localStorage بتتحفظ بعد تشغيلة ناجحة وبترجع في context الموقع التشغيلة الجاية
+   → مش بنعدي على Cloudflare / consent / cookie negotiation كل 5 دقائق
+✅ Expiry (TTL index) + بتتمسح أول ما الموقع يفشل وهي مستخدمة
+✅ زمن أول صفحة warm vs cold لكل موقع (صفحات الـ browser بس - الـ feed / API بـ HTTP بيتعدوا لوحدهم)
+"""
+
+import os
+from collections import deque
+from datetime import datetime, timezone, timedelta
+
+from src.services.utils import aware, percentile
+
+# عمر الـ session المحفوظة
+SESSION_TTL_HOURS = float(os.getenv("SESSION_TTL_HOURS", 12))
+# أقصى حجم للـ state (bytes تقريباً) - أكبر من كده مش بنحفظه
+SESSION_MAX_BYTES = int(os.getenv("SESSION_MAX_BYTES", 512 * 1024))
+
+COLLECTION = "site_sessions"
+
+# زمن أول صفحة listing (ms) لكل موقع: {"warm": deque, "cold": deque}
+_FIRST_PAGE: dict[str, dict] = {}
+_INVALIDATED: dict[str, int] = {}
+
+
+async def load(db, site_key: str) -> dict | None:
+    """الـ storage_state المحفوظة (لو لسه صالحة)"""
+    doc = await db[COLLECTION].find_one({"_id": site_key})
+    if not doc or not doc.get("state"):
+        return None
+    expires = aware(doc.get("expiresAt"))
+    if expires and expires <= datetime.now(timezone.utc):
+        return None
+    return doc["state"]
+
+
+async def save(db, site_key: str, state: dict):
+    if not state or len(str(state)) > SESSION_MAX_BYTES:
+        return
+    now = datetime.now(timezone.utc)
+    await db[COLLECTION].update_one(
+        {"_id": site_key},
+        {"$set": {
+            "state":     state,
+            "cookies":   len(state.get("cookies", [])),
+            "savedAt":   now,
+            "expiresAt": now + timedelta(hours=SESSION_TTL_HOURS),
+        }},
+        upsert=True
+    )
+
+
+async def invalidate(db, site_key: str):
+    """الموقع فشل والـ session مستخدمة → نبدأ cold المرة الجاية"""
+    _INVALIDATED[site_key] = _INVALIDATED.get(site_key, 0) + 1
+    await db[COLLECTION].delete_one({"_id": site_key})
+
+
+def record_first_page(site_key: str, warm: bool, ms: float, via: str | None = "browser"):
+    """via=http (wp_feed / real.discount API): مفيش browser - الـ session مالهاش أثر فمش بتدخل الـ warm/cold"""
+    samples = _FIRST_PAGE.setdefault(site_key, {"warm": deque(maxlen=50), "cold": deque(maxlen=50), "http": 0})
+    if via == "http":
+        samples["http"] += 1
+        return
+    samples["warm" if warm else "cold"].append(ms)
+
+
+def get_stats() -> dict:
+    stats = {}
+    for site_key in set(_FIRST_PAGE) | set(_INVALIDATED):
+        samples = _FIRST_PAGE.get(site_key, {"warm": (), "cold": (), "http": 0})
+        stats[site_key] = {
+            "warm_runs":         len(samples["warm"]),
+            "cold_runs":         len(samples["cold"]),
+            # أول صفحة جت من الـ feed / API - برا الـ warm/cold
+            "http_runs":         samples["http"],
+            "warm_first_page_ms": percentile(samples["warm"], 50),
+            "cold_first_page_ms": percentile(samples["cold"], 50),
+            "invalidated":       _INVALIDATED.get(site_key, 0),
+        }
+    return stats
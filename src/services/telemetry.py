@@ -0,0 +1,184 @@
+"""
+Run Telemetry
+✅ كل تشغيل (scrape / expire) بيتسجل كـ document في scrape_runs
+✅ لكل موقع: المدة + زمن التحميل والاستخراج لكل صفحة + العدادات
+✅ Freshness: من أول ما الكورس ظهر في الـ listing لحد ما بقى موجود في الـ API
+"""
+
+import os
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+
+from src.services.utils import percentile
+
+# الـ TTL index بيمسح التشغيلات الأقدم من كده
+RUNS_RETENTION_DAYS = int(os.getenv("RUNS_RETENTION_DAYS", 30))
+
+COLLECTION = "scrape_runs"
+
+# زمن الـ navigation للصفحة الحالية (safe_goto بيكتب فيه)
+_page_timing: ContextVar[dict | None] = ContextVar("page_timing", default=None)
+# الـ SiteRecorder بتاع الموقع اللي شغال دلوقتي (كل موقع في task لوحده)
+_current_site: ContextVar["SiteRecorder | None"] = ContextVar("current_site", default=None)
+
+
+def begin_page() -> dict:
+    timing = {}
+    _page_timing.set(timing)
+    return timing
+
+
+def record_nav(seconds: float, via: str = "browser"):
+    """via: browser (safe_goto) أو http (feed / API من غير browser)"""
+    timing = _page_timing.get()
+    if timing is not None:
+        timing["nav"] = seconds
+        timing["via"] = via
+
+
+def use_site(recorder: "SiteRecorder"):
+    return _current_site.set(recorder)
+
+
+def release_site(token):
+    _current_site.reset(token)
+
+
+def current_site() -> "SiteRecorder | None":
+    return _current_site.get()
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 1)
+
+
+def _percentiles(values: list) -> dict:
+    if not values:
+        return {}
+    return {"p50": percentile(values, 50, 2), "p95": percentile(values, 95, 2), "max": round(max(values), 2)}
+
+
+class SiteRecorder:
+    COUNTERS = ("discovered", "known", "cached", "negative", "near_dup", "inline", "resolved", "failed", "saved", "skipped")
+
+    def __init__(self, site_key: str):
+        self.site_key  = site_key
+        self.started   = time.monotonic()
+        self.ended     = None
+        self.pages     = []
+        self.counts    = dict.fromkeys(self.COUNTERS, 0)
+        self.freshness = []
+        self.stages    = {}
+        self.session   = None
+        self.error     = None
+
+    def page(self, page_no: int, total: float, nav: float | None, items: int, ok: bool = True,
+             via: str | None = None):
+        nav = nav if nav is not None else total
+        self.pages.append({
+            "page":      page_no,
+            "navMs":     _ms(nav),
+            "extractMs": _ms(max(0.0, total - nav)),
+            "items":     items,
+            "ok":        ok,
+            "via":       via,
+        })
+
+    def listing_failed(self) -> bool:
+        """
+        صفحات اتجربت وولا واحدة اتحملت
+        (تشغيلة اتكملت من checkpoint / اتقطعت في الـ drain / وقفت على صفحة معروفة مش فشل)
+        """
+        return bool(self.pages) and not any(p["ok"] for p in self.pages)
+
+    def add(self, counter: str, n: int = 1):
+        self.counts[counter] += n
+
+    def fresh(self, seen_at: float):
+        """seen_at = time.monotonic() وقت ما صفحة الـ listing اتقرت"""
+        self.freshness.append(time.monotonic() - seen_at)
+
+    def finish(self):
+        self.ended = time.monotonic()
+
+    def to_doc(self) -> dict:
+        ended = self.ended or time.monotonic()
+        return {
+            "durationMs":       _ms(ended - self.started),
+            "pages":            self.pages,
+            "counts":           self.counts,
+            "freshnessSeconds": _percentiles(self.freshness),
+            "stages":           self.stages,
+            "session":          self.session,
+            "error":            self.error,
+        }
+
+
+class RunRecorder:
+    """
+    الاستخدام:
+        run = RunRecorder("scrape", engine="camoufox")
+        await run.start(db)
+        site = run.site("couponscorpion")
+        ...
+        await run.finish(db)
+    """
+
+    def __init__(self, kind: str, engine: str | None = None):
+        self.kind       = kind
+        self.engine     = engine
+        self.id         = None
+        self.started_at = datetime.now(timezone.utc)
+        self.started    = time.monotonic()
+        self.sites      = {}
+
+    def site(self, site_key: str) -> SiteRecorder:
+        return self.sites.setdefault(site_key, SiteRecorder(site_key))
+
+    async def start(self, db):
+        result = await db[COLLECTION].insert_one({
+            "kind":      self.kind,
+            "engine":    self.engine,
+            "status":    "running",
+            "startedAt": self.started_at,
+        })
+        self.id = result.inserted_id
+
+    async def finish(self, db, status: str = "ok", totals: dict | None = None):
+        sites = {key: rec.to_doc() for key, rec in self.sites.items()}
+        if totals is None:
+            totals = dict.fromkeys(SiteRecorder.COUNTERS, 0)
+            for rec in self.sites.values():
+                for counter, n in rec.counts.items():
+                    totals[counter] += n
+        doc = {
+            "kind":       self.kind,
+            "engine":     self.engine,
+            "status":     status,
+            "startedAt":  self.started_at,
+            "endedAt":    datetime.now(timezone.utc),
+            "durationMs": _ms(time.monotonic() - self.started),
+            "sites":      sites,
+            "totals":     totals,
+        }
+        if self.id is None:
+            await db[COLLECTION].insert_one(doc)
+        else:
+            await db[COLLECTION].update_one({"_id": self.id}, {"$set": doc})
+
+
+async def list_runs(db, kind: str | None = None, since=None, until=None, limit: int = 50) -> list:
+    filt = {}
+    if kind:
+        filt["kind"] = kind
+    if since or until:
+        filt["startedAt"] = {}
+        if since: filt["startedAt"]["$gte"] = since
+        if until: filt["startedAt"]["$lte"] = until
+
+    runs = []
+    async for doc in db[COLLECTION].find(filt).sort("startedAt", -1).limit(limit):
+        doc["id"] = str(doc.pop("_id"))
+        runs.append(doc)
+    return runs
@@ -0,0 +1,61 @@
+"""
+Per-Host Throttle
+✅ بيحدد عدد الطلبات في الثانية لكل دومين
+✅ بيحدد أقصى عدد صفحات مفتوحة في نفس الوقت لكل دومين
+✅ بدل الـ sleep الثابت بين كل كورس والتاني
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from urllib.parse import urlparse
+
+
+class HostLimiter:
+    """
+    Politeness limiter لكل host
+
+    الاستخدام:
+        async with limiter.slot(url):
+            ... افتح الصفحة ...
+    """
+
+    def __init__(self, rps: float, max_inflight: int):
+        self.rps          = rps
+        self.max_inflight = max(1, max_inflight)
+        self._hosts       = {}
+        self._loop        = None
+
+    def _state(self, host: str) -> dict:
+        # الـ asyncio primitives مربوطة بالـ loop - لو اتغير (asyncio.run جديد) نبدأ من الأول
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._hosts.clear()
+            self._loop = loop
+        if host not in self._hosts:
+            self._hosts[host] = {
+                "sem":  asyncio.Semaphore(self.max_inflight),
+                "lock": asyncio.Lock(),
+                "next": 0.0,
+            }
+        return self._hosts[host]
+
+    async def _wait_turn(self, state: dict):
+        """بيوزع الطلبات على الوقت بحيث ما نعديش rps"""
+        if self.rps <= 0:
+            return
+        interval = 1.0 / self.rps
+        async with state["lock"]:
+            now  = time.monotonic()
+            wait = state["next"] - now
+            state["next"] = max(now, state["next"]) + interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    @asynccontextmanager
+    async def slot(self, url: str):
+        host  = urlparse(url).netloc.lower()
+        state = self._state(host)
+        async with state["sem"]:
+            await self._wait_turn(state)
+            yield
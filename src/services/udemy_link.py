@@ -0,0 +1,207 @@
+"""
+Canonical Udemy Link
+✅ أي لينك اتحل (linksynergy / tracking redirect / udemy بـ query زيادة) → https://www.udemy.com/course/<slug>/?couponCode=X
+✅ الـ wrappers المعروفة بتتفك offline (murl / RD_PARM1 / أي param فيه لينك udemy)
+✅ اللي مش معروف → redirect resolution مرة واحدة على الـ HTTP client المشترك (hop بـ hop لحد ما يبان لينك udemy)
+✅ courseSlug + couponCode بيتحفظوا مع الكورس (indexed) - الـ dedup والـ expire بيشتغلوا عليهم
+"""
+
+import os
+import logging
+from collections import OrderedDict
+from urllib.parse import urlsplit, parse_qsl, unquote
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from src.services import http_resolver
+
+log = logging.getLogger("RILLZO")
+
+# أقصى عدد redirects نمشيها ورا tracking link
+CANONICAL_MAX_HOPS = int(os.getenv("CANONICAL_MAX_HOPS", 5))
+
+# بنفك الـ wrappers دي من الـ query params (بالترتيب)
+WRAPPER_PARAMS = ("murl", "RD_PARM1", "u", "url", "redirect", "dest", "destination", "r")
+
+_CACHE: OrderedDict = OrderedDict()
+_CACHE_SIZE = 5000
+
+STATS = {"offline": 0, "resolved": 0, "unresolved": 0}
+
+
+def parse(url: str | None) -> tuple[str, str | None] | None:
+    """(courseSlug, couponCode) لو ده لينك كورس udemy - غير كده None"""
+    if not url:
+        return None
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return None
+    host = (parts.hostname or "").lower()
+    if host != "udemy.com" and not host.endswith(".udemy.com"):
+        return None
+    segments = [s for s in parts.path.split("/") if s]
+    if len(segments) < 2 or segments[0] != "course":
+        return None
+    coupon = next((v for k, v in parse_qsl(parts.query) if k.lower() == "couponcode" and v), None)
+    return segments[1].lower(), coupon
+
+
+def build(slug: str, coupon: str | None) -> str:
+    base = f"https://www.udemy.com/course/{slug}/"
+    return f"{base}?couponCode={coupon}" if coupon else base
+
+
+def _unwrap(url: str, depth: int = 0) -> str | None:
+    """لينك udemy جوه query params بتاعة wrapper (ممكن يكون متلفوف أكتر من مرة)"""
+    if parse(url):
+        return url
+    if depth > 3:
+        return None
+    try:
+        params = parse_qsl(urlsplit(url).query)
+    except ValueError:
+        return None
+    ordered = sorted(params, key=lambda kv: WRAPPER_PARAMS.index(kv[0]) if kv[0] in WRAPPER_PARAMS else len(WRAPPER_PARAMS))
+    for _, value in ordered:
+        value = unquote(value)
+        if value.startswith("http"):
+            inner = _unwrap(value, depth + 1)
+            if inner:
+                return inner
+    return None
+
+
+def canonicalize(url: str | None) -> str | None:
+    """offline بس (من غير network)"""
+    inner = _unwrap(url) if url else None
+    parsed = parse(inner)
+    return build(*parsed) if parsed else None
+
+
+async def _follow(url: str) -> str | None:
+    """بنمشي الـ redirects hop بـ hop ونقف أول ما الـ Location يبقى لينك udemy (من غير ما نحمل صفحة udemy)"""
+    client = http_resolver.get_client()
+    current = url
+    for _ in range(CANONICAL_MAX_HOPS):
+        response = await client.get(current, follow_redirects=False)
+        location = response.headers.get("location")
+        if not location or not response.is_redirect:
+            return None
+        current = str(response.url.join(location))
+        found = canonicalize(current)
+        if found:
+            return found
+    return None
+
+
+async def canonical(url: str | None) -> str | None:
+    """
+    اللينك الـ canonical - أو اللينك زي ما هو لو ما عرفناش نوصل لـ udemy
+    (عشان ما نخسرش كورس بسبب tracker واقع)
+    """
+    if not url:
+        return url
+    if url in _CACHE:
+        _CACHE.move_to_end(url)
+        return _CACHE[url]
+    found = canonicalize(url)
+    if found:
+        STATS["offline"] += 1
+    else:
+        try:
+            found = await _follow(url)
+        except Exception as e:
+            log.debug(f"🔗 فشل فك الـ redirect {url[:60]}: {e}")
+            found = None
+        STATS["resolved" if found else "unresolved"] += 1
+    result = found or url
+    _CACHE[url] = result
+    while len(_CACHE) > _CACHE_SIZE:
+        _CACHE.popitem(last=False)
+    return result
+
+
+def fields(url: str | None) -> dict:
+    """courseSlug / couponCode اللي بيتحفظوا مع الكورس"""
+    parsed = parse(url)
+    if not parsed:
+        return {}
+    return {"courseSlug": parsed[0], "couponCode": parsed[1]}
+
+
+_backfilled = False
+
+
+async def backfill(db, batch: int = 500):
+    """الكورسات القديمة: courseSlug / couponCode من الـ udemyLink (offline) - مرة واحدة لكل process"""
+    global _backfilled
+    if _backfilled:
+        return
+    _backfilled = True
+    pending, total = [], 0
+    async for doc in db["courses"].find({"courseSlug": {"$exists": False}, "dupOf": {"$exists": False}}, {"udemyLink": 1}):
+        f = fields(canonicalize(doc.get("udemyLink")))
+        if not f:
+            continue
+        pending.append((doc["_id"], f))
+        if len(pending) >= batch:
+            total += await _write_keys(db, pending)
+            pending = []
+    if pending:
+        total += await _write_keys(db, pending)
+    if total:
+        log.info(f"🔗 canonical: اتحسب courseSlug لـ {total} كورس قديم")
+
+
+async def _write_keys(db, pending: list) -> int:
+    """
+    الـ courseSlug عليه unique index - الكورس اللي اتحفظ قبل كده (في الـ DB أو في نفس الـ batch)
+    بياخد dupOf بدل courseSlug (وما بيرجعش للـ backfill تاني)
+    """
+    slugs = [f["courseSlug"] for _, f in pending]
+    taken = set(await db["courses"].distinct("courseSlug", {"courseSlug": {"$in": slugs}}))
+    ops, written = [], 0
+    for _id, f in pending:
+        if f["courseSlug"] in taken:
+            ops.append(UpdateOne({"_id": _id}, {"$set": {"couponCode": f["couponCode"], "dupOf": f["courseSlug"]}}))
+            continue
+        taken.add(f["courseSlug"])
+        ops.append(UpdateOne({"_id": _id}, {"$set": f}))
+        written += 1
+    try:
+        await db["courses"].bulk_write(ops, ordered=False)
+    except BulkWriteError as e:
+        # 11000 = الـ writer حفظ نفس الكورس في نفس اللحظة - المحاولة الجاية في process تاني
+        for err in e.details.get("writeErrors", []):
+            written -= 1
+            if err.get("code") != 11000:
+                log.error(f"🔗 canonical backfill: {err.get('errmsg')}")
+    return written
+
+
+async def release_duplicate_keys(db) -> int:
+    """
+    قبل الـ unique index على courseSlug: نفس الكورس ممكن يكون متحفظ أكتر من مرة من قبل الـ dedup
+    الأقدم بيفضل ماسك الـ courseSlug - الباقي بيتشال منهم (dupOf) ويفضلوا موجودين برا الـ index
+    """
+    released = 0
+    async for group in db["courses"].aggregate([
+        {"$match": {"courseSlug": {"$type": "string"}}},
+        {"$sort": {"_id": 1}},
+        {"$group": {"_id": "$courseSlug", "ids": {"$push": "$_id"}}},
+        {"$match": {"ids.1": {"$exists": True}}},
+    ]):
+        result = await db["courses"].update_many(
+            {"_id": {"$in": group["ids"][1:]}},
+            {"$set": {"dupOf": group["_id"]}, "$unset": {"courseSlug": ""}},
+        )
+        released += result.modified_count
+    if released:
+        log.warning(f"🔗 canonical: {released} كورس مكرر (نفس الـ courseSlug) - اتشال من الـ unique index")
+    return released
+
+
+def get_stats() -> dict:
+    return dict(STATS, cached=len(_CACHE))
@@ -0,0 +1,18 @@
+"""
+Helpers مشتركة بين الـ services
+✅ aware: أي datetime راجع من Mongo من غير tzinfo بيتعامل كـ UTC
+✅ percentile: نفس الـ nearest-rank percentile للـ stats والـ benchmarks
+"""
+
+from datetime import datetime, timezone
+
+
+def aware(dt: datetime | None) -> datetime | None:
+    return dt.replace(tzinfo=timezone.utc) if dt and dt.tzinfo is None else dt
+
+
+def percentile(values, pct: float, digits: int = 1) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))], digits)
@@ -0,0 +1,178 @@
+"""
+WordPress Feed Discovery
+✅ couponscorpion و onlinecourses مواقع WordPress - الـ listing بييجي من الـ WP REST API أو الـ RSS بـ HTTP عادي
+   بدل render لكل صفحة في الـ browser
+✅ الترتيب: /wp-json/wp/v2/posts الأول (فيه pagination + الصورة) → /feed/ → الـ browser لو الاتنين مش متاحين
+✅ Conditional requests: ETag / Last-Modified لكل صفحة محفوظين في scrape_state
+   304 → نفس الكورسات اللي اتحفظت المرة اللي فاتت (الـ page_known بيوقف من أول request)
+✅ بيرجع نفس شكل الـ DOM: {title, detailLink, image, source}
+"""
+
+import os
+import re
+import time
+import logging
+import xml.etree.ElementTree as ET
+from contextvars import ContextVar
+from html import unescape
+
+from src.services import http_resolver
+
+log = logging.getLogger("RILLZO")
+
+WP_FEED            = os.getenv("WP_FEED", "true") == "true"
+FEED_PER_PAGE      = int(os.getenv("FEED_PER_PAGE", 20))
+# الـ feed مش متاح → الـ browser لحد ما المدة دي تعدي وبعدين نجرب تاني
+FEED_RETRY_MINUTES = float(os.getenv("FEED_RETRY_MINUTES", 30))
+
+SITES = {
+    "couponscorpion": "https://couponscorpion.com",
+    "onlinecourses":  "https://www.onlinecourses.ooo",
+}
+
+BACKENDS = ("rest", "rss")
+
+_MEDIA = "{http://search.yahoo.com/mrss/}"
+_CONTENT = "{http://purl.org/rss/1.0/modules/content/}encoded"
+_IMG = re.compile(r"""<img[^>]+?(?:data-lazy-src|data-src|src)=["']([^"']+)["']""", re.I)
+_TAGS = re.compile(r"<[^>]+>")
+
+# الـ backend اللي اشتغل لكل موقع (في الذاكرة)
+_backend: dict[str, str] = {}
+_down_until: dict[str, float] = {}
+
+# (validators, conditional) بتوع الموقع اللي شغال - _listing بيحطهم من الـ SiteState
+_current: ContextVar[tuple | None] = ContextVar("feed_validators", default=None)
+
+# {site_key: counters}
+STATS: dict[str, dict] = {}
+
+
+def _stat(site_key: str) -> dict:
+    return STATS.setdefault(site_key, {"rest": 0, "rss": 0, "not_modified": 0, "unavailable": 0})
+
+
+def supports(site_key: str) -> bool:
+    return WP_FEED and site_key in SITES
+
+
+def use(validators: dict, conditional: bool = True):
+    """conditional=False في الـ deep crawl - الصفحات بتتجاب كاملة (والـ validators بتتحدث)"""
+    return _current.set((validators, conditional))
+
+
+def release(token):
+    _current.reset(token)
+
+
+def _url(backend: str, base: str, page: int) -> str:
+    if backend == "rest":
+        return f"{base}/wp-json/wp/v2/posts?per_page={FEED_PER_PAGE}&page={page}&_embed=wp:featuredmedia"
+    return f"{base}/feed/" if page == 1 else f"{base}/feed/?paged={page}"
+
+
+def _text(html: str | None) -> str:
+    return " ".join(unescape(_TAGS.sub(" ", html or "")).split())
+
+
+def parse_rest(payload, source: str) -> list:
+    courses = []
+    for post in payload if isinstance(payload, list) else []:
+        if not isinstance(post, dict):
+            continue
+        title = _text((post.get("title") or {}).get("rendered"))
+        link  = post.get("link")
+        media = ((post.get("_embedded") or {}).get("wp:featuredmedia") or [{}])[0] or {}
+        og    = ((post.get("yoast_head_json") or {}).get("og_image") or [{}])[0] or {}
+        image = media.get("source_url") or post.get("jetpack_featured_media_url") or og.get("url")
+        if title and link:
+            courses.append({"title": title, "detailLink": link, "image": image or None, "source": source})
+    return courses
+
+
+def parse_rss(text: str, source: str) -> list:
+    courses = []
+    for item in ET.fromstring(text).iter("item"):
+        title = _text(item.findtext("title"))
+        link  = (item.findtext("link") or "").strip()
+        image = None
+        for tag in (f"{_MEDIA}content", f"{_MEDIA}thumbnail", "enclosure"):
+            el = item.find(tag)
+            if el is not None and el.get("url") and (tag != "enclosure" or "image" in (el.get("type") or "image")):
+                image = el.get("url")
+                break
+        if not image:
+            found = _IMG.search((item.findtext(_CONTENT) or "") + (item.findtext("description") or ""))
+            image = found.group(1) if found else None
+        if title and link:
+            courses.append({"title": title, "detailLink": link, "image": image, "source": source})
+    return courses
+
+
+async def fetch_page(site_key: str, page: int) -> list | None:
+    """
+    بيرجع كورسات صفحة الـ listing من الـ feed
+    None معناها: الـ feed مش متاح - الـ scraper لازم يجرب الـ browser
+    """
+    if not supports(site_key) or _down_until.get(site_key, 0) > time.monotonic():
+        return None
+    stat = _stat(site_key)
+    validators, conditional = _current.get() or ({}, False)
+    key      = str(page)
+    entry    = validators.get(key) or {}
+    known    = _backend.get(site_key)
+    backends = (known,) if known else BACKENDS
+
+    for backend in backends:
+        url = _url(backend, SITES[site_key], page)
+        headers = {"Accept": "application/json" if backend == "rest" else "application/rss+xml, application/xml"}
+        if conditional and entry.get("url") == url:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("lastModified"):
+                headers["If-Modified-Since"] = entry["lastModified"]
+        try:
+            response = await http_resolver.get_client().get(url, headers=headers)
+            if response.status_code == 304 and entry.get("courses") is not None:
+                stat["not_modified"] += 1
+                return [{**c, "source": site_key} for c in entry["courses"]]
+            if page > 1 and response.status_code in (400, 404):
+                # بعد آخر صفحة (REST بيرجع 400 - الـ RSS بيرجع 404)
+                # (الصفحات بتتجاب بالتوازي - ممكن تخلص قبل ما صفحة 1 تعرف الـ backend)
+                return []
+            if response.status_code != 200:
+                continue
+            if backend == "rest":
+                courses = parse_rest(response.json(), site_key)
+            else:
+                courses = parse_rss(response.text, site_key)
+        except Exception as e:
+            log.debug(f"[{site_key}] 📰 {backend} صفحة {page}: {e}")
+            continue
+        if not courses:
+            continue
+        if known != backend:
+            log.info(f"[{site_key}] 📰 الـ listing من الـ {backend} feed (من غير browser)")
+        _backend[site_key] = backend
+        validators[key] = {
+            "url":          url,
+            "etag":         response.headers.get("etag"),
+            "lastModified": response.headers.get("last-modified"),
+            "courses":      [{k: c[k] for k in ("title", "detailLink", "image")} for c in courses],
+        }
+        stat[backend] += 1
+        return courses
+
+    if page > 1:
+        # صفحة واحدة فشلت - الـ browser للصفحة دي بس
+        # صفحة 1 بس هي اللي بتحكم إن الـ feed كله مش متاح
+        return None
+    _backend.pop(site_key, None)
+    _down_until[site_key] = time.monotonic() + FEED_RETRY_MINUTES * 60
+    stat["unavailable"] += 1
+    log.warning(f"[{site_key}] 📰 الـ feed مش متاح - الـ browser لمدة {FEED_RETRY_MINUTES:g} دقيقة")
+    return None
+
+
+def get_stats() -> dict:
+    return {site: {**counts, "backend": _backend.get(site)} for site, counts in STATS.items()}
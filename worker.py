@@ -0,0 +1,65 @@
+"""
+╔══════════════════════════════════════════════════════════════════════╗
+║          RILLZO Worker - السكرابر والـ expire في process لوحده       ║
+║          بيتواصل مع الـ API عن طريق jobs collection في MongoDB        ║
+╚══════════════════════════════════════════════════════════════════════╝
+
+التشغيل:
+    python worker.py
+"""
+
+import asyncio
+import os
+import signal
+import logging
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from src.services.browser_manager import browser_manager
+from src.services.http_resolver import close_client as close_http_client
+from src.services.indexes import ensure_indexes
+from src.services.jobs import Worker
+
+# ─────────────────────────────────────────────
+# 🔧 إعداد البيئة
+# ─────────────────────────────────────────────
+load_dotenv()
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    datefmt="%H:%M:%S"
+)
+log = logging.getLogger("RILLZO")
+
+MONGO_URI = os.getenv("MONGO_URI") or os.getenv("MONGODB_URI", "mongodb://localhost:27017")
+DB_NAME   = os.getenv("DB_NAME", "rillzo")
+
+
+async def main():
+    log.info("🔌 جاري الاتصال بـ MongoDB...")
+    mongo_client = AsyncIOMotorClient(MONGO_URI)
+    db = mongo_client[DB_NAME]
+    await ensure_indexes(db)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    worker = Worker(db)
+    await worker.start()
+
+    await stop.wait()  # ← الـ worker شغال هنا
+
+    # ── إيقاف التشغيل ──
+    await worker.stop()
+    await browser_manager.close()
+    await close_http_client()
+    mongo_client.close()
+    log.info("🛑 تم إيقاف الـ Worker بنظافة")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())